@@ -4,13 +4,36 @@ A beautiful, comprehensive MCAT preparation application
 """
 
 import streamlit as st
+import numpy as np
+import copy
 import json
 import os
 import random
+import re
+import sqlite3
 import requests
+import hashlib
+import hmac
 import html
+import importlib
+import string
+import threading
+import time
 from datetime import datetime, date, timedelta
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from streamlit.runtime.scriptrunner import add_script_run_ctx
+
+from utils.cards import Card
+from utils.spaced_repetition import sm2_schedule
+from utils.trivia_api import MCQ
+
+try:
+    import orjson
+except ImportError:  # Fall back to the stdlib parser when orjson isn't installed
+    orjson = None
 
 # ============================================
 # PAGE CONFIGURATION - Must be first!
@@ -27,79 +50,398 @@ st.set_page_config(
 # ============================================
 DATA_DIR = os.path.join(os.path.dirname(__file__), 'data')
 FLASHCARDS_FILE = os.path.join(DATA_DIR, 'flashcards.json')
+FLASHCARDS_META_FILE = os.path.join(DATA_DIR, 'flashcards_meta.json')
 PROGRESS_FILE = os.path.join(DATA_DIR, 'progress.json')
 SRS_FILE = os.path.join(DATA_DIR, 'srs_data.json')
+STUDY_DB_FILE = os.path.join(DATA_DIR, 'study.db')
+TRIVIA_CACHE_FILE = os.path.join(DATA_DIR, 'trivia_last.json')
 
 # ============================================
 # SESSION STATE INITIALIZATION
 # ============================================
+SESSION_DEFAULTS = {
+    'authenticated': False,
+    'current_page': 'home',
+    'current_card_index': 0,
+    'show_answer': False,
+    'score': {'correct': 0, 'incorrect': 0},
+    'selected_category': 'all',
+    'dark_mode': True,  # Dark mode always enabled
+    'quiz_active': False,
+    'quiz_questions': [],
+    'quiz_current': 0,
+    'quiz_score': 0,
+    'quiz_answers': [],
+    'timer_active': False,
+    'timer_start': None,
+    'timer_duration': 60,
+    'timed_card_ids': [],  # Deck indices drawn for the timed session
+    'random_card_order': {},  # (category, deck_size) -> remaining shuffled indices, see pick_random_card_index()
+    'bookmarked_cards': frozenset(),  # Card IDs, replaced on each toggle
+    'study_streak': 0,
+    'last_study_date': None,
+    'show_welcome_popup': False,  # For dedication popup
+    'confirm_reset': False,  # Sidebar reset confirmation
+    'confirm_reset_progress': False,  # Progress page reset confirmation
+    '_pending_progress': {'correct': 0, 'incorrect': 0},  # Not yet written to disk
+    '_last_progress_flush': 0.0,
+    '_has_celebrated': False,  # Balloons already shown this session
+    'srs_data': None,  # Loaded on first review, see get_srs_data()
+    'srs_pending_writes': 0,  # Reviews in srs_data not yet written to disk
+    'srs_dirty_cards': set(),  # Card ids those reviews touched
+    'flashcards_data': None,  # (mtime_ns, deck) pinned by load_flashcards()
+    '_last_questions': (),  # Last question pool loaded, see load_question_pool()
+}
+
+
 def init_session_state():
-    """Initialize all session state variables"""
-    defaults = {
-        'authenticated': False,
-        'current_page': 'home',
-        'current_card_index': 0,
-        'show_answer': False,
-        'score': {'correct': 0, 'incorrect': 0},
-        'selected_category': 'all',
-        'filtered_cards': [],
-        'dark_mode': True,  # Dark mode always enabled
-        'quiz_active': False,
-        'quiz_questions': [],
-        'quiz_current': 0,
-        'quiz_score': 0,
-        'quiz_answers': [],
-        'timer_active': False,
-        'timer_start': None,
-        'timer_duration': 60,
-        'bookmarked_cards': set(),
-        'study_streak': 0,
-        'last_study_date': None,
-        'show_welcome_popup': False,  # For dedication popup
-    }
-    for key, value in defaults.items():
-        if key not in st.session_state:
-            st.session_state[key] = value
+    """Initialize all session state variables (once per session)
+
+    The flag records how many defaults were applied, so a session that
+    outlives a code reload still picks up newly added keys.
+    """
+    if st.session_state.get('_initialized') == len(SESSION_DEFAULTS):
+        return
+    for key, value in SESSION_DEFAULTS.items():
+        # Copy so mutable defaults aren't shared between sessions
+        st.session_state.setdefault(key, copy.deepcopy(value))
+    st.session_state._initialized = len(SESSION_DEFAULTS)
 
 init_session_state()
 
 # ============================================
 # DATA LOADING FUNCTIONS
 # ============================================
-@st.cache_data
-def load_flashcards():
-    """Load flashcards from JSON file"""
+def read_json(path: str):
+    """Parse a JSON file, using orjson when available
+
+    The file is read as bytes either way; json.loads decodes UTF-8 bytes
+    itself, which skips the TextIOWrapper decoding path.
+    """
+    with open(path, 'rb') as f:
+        return parse_json(f.read())
+
+def parse_json(raw: bytes):
+    """Parse a JSON payload such as an HTTP response body, using orjson when available"""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+def write_json(path: str, data):
+    """Serialize data to a JSON file, using orjson when available
+
+    The payload is serialized up front and written to a temporary file in
+    one call, then swapped into place so a crash never leaves a torn file.
+    Output is compact: the files written here are caches only the app reads.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if orjson is not None:
+        payload = orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+    else:
+        payload = json.dumps(data, separators=(',', ':')).encode('utf-8')
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(payload)
+    os.replace(tmp_path, path)
+
+def file_mtime_ns(path: str) -> int:
+    """Modification time of a file in nanoseconds, or 0 if it doesn't exist"""
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return 0
+
+@st.cache_data(show_spinner=False)
+def _load_flashcards(source_mtime_ns: int):
     try:
-        with open(FLASHCARDS_FILE, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        data = read_json(FLASHCARDS_FILE)
     except FileNotFoundError:
         return {"categories": [], "flashcards": []}
+    data['flashcards'] = [Card.from_dict(c) for c in data.get('flashcards', [])]
+    return data
 
-def load_progress():
-    """Load user progress data"""
-    if os.path.exists(PROGRESS_FILE):
-        with open(PROGRESS_FILE, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    return {'daily_scores': [], 'total_studied': 0, 'streak': 0, 'last_study_date': None}
+def load_flashcards():
+    """Load flashcards from JSON file (cached until the file changes)
+
+    The deck is pinned in session state so reruns reuse the same object
+    instead of unpickling a fresh copy from st.cache_data; treat it as
+    read-only.
+    """
+    source_mtime_ns = file_mtime_ns(FLASHCARDS_FILE)
+    pinned = st.session_state.flashcards_data
+    if pinned is None or pinned[0] != source_mtime_ns:
+        pinned = (source_mtime_ns, _load_flashcards(source_mtime_ns))
+        st.session_state.flashcards_data = pinned
+    return pinned[1]
+
+@st.cache_data(show_spinner=False)
+def _load_card_index(source_mtime_ns: int) -> Dict:
+    flashcards = _load_flashcards(source_mtime_ns).get('flashcards', [])
+    count = len(flashcards)
+    category = np.array([c.category for c in flashcards], dtype=str)
+    high_yield = np.fromiter((c.high_yield for c in flashcards), dtype=bool, count=count)
+
+    # Group every card in one vectorized pass instead of one mask per category
+    cat_ids, inverse = np.unique(category, return_inverse=True)
+    totals = np.bincount(inverse, minlength=len(cat_ids))
+    high_yield_totals = np.bincount(inverse, weights=high_yield, minlength=len(cat_ids))
+    grouped = np.split(np.argsort(inverse, kind='stable'), np.cumsum(totals)[:-1])
+
+    by_category = {str(cat_id): positions for cat_id, positions in zip(cat_ids, grouped)}
+    category_counts = {
+        str(cat_id): (int(total), int(hy_total))
+        for cat_id, total, hy_total in zip(cat_ids, totals, high_yield_totals)
+    }
 
-def save_progress(progress):
-    """Save user progress data"""
+    return {
+        'category': category,
+        'high_yield': high_yield,
+        'by_category': by_category,
+        'category_counts': category_counts,
+    }
+
+@st.cache_data(show_spinner=False)
+def _load_categories_by_id(source_mtime_ns: int) -> Dict[str, Dict]:
+    return {c['id']: c for c in _load_flashcards(source_mtime_ns).get('categories', [])}
+
+@st.cache_data(show_spinner=False)
+def _load_category_choices(source_mtime_ns: int) -> Tuple[tuple, tuple]:
+    categories = _load_flashcards(source_mtime_ns).get('categories', [])
+    options = ('all',) + tuple(cat['id'] for cat in categories)
+    names = ('📚 All Categories',) + tuple(f"{cat['icon']} {cat['name']}" for cat in categories)
+    return options, names
+
+def load_category_choices() -> Tuple[tuple, tuple]:
+    """(ids, labels) for the category selectbox, with 'all' first"""
+    return _load_category_choices(file_mtime_ns(FLASHCARDS_FILE))
+
+def load_card_index() -> Dict:
+    """Column arrays over the deck, aligned with load_flashcards()['flashcards']
+
+    Also holds the card positions and (total, high yield) counts for each
+    category, so pages look them up instead of filtering on every rerun.
+    """
+    return _load_card_index(file_mtime_ns(FLASHCARDS_FILE))
+
+def build_flashcards_meta(source_mtime_ns: int) -> Dict:
+    """Summarize flashcards.json into the small meta file read by the home page"""
+    data = _load_flashcards(source_mtime_ns)
+    meta = {
+        'source_mtime_ns': source_mtime_ns,
+        'total': len(data.get('flashcards', [])),
+        'categories': data.get('categories', []),
+    }
+    try:
+        write_json(FLASHCARDS_META_FILE, meta)
+    except OSError:
+        pass
+    return meta
+
+@st.cache_data(show_spinner=False)
+def _load_flashcards_meta(source_mtime_ns: int) -> Dict:
+    if os.path.exists(FLASHCARDS_META_FILE):
+        try:
+            meta = read_json(FLASHCARDS_META_FILE)
+            if meta.get('source_mtime_ns') == source_mtime_ns:
+                return meta
+        except (OSError, ValueError):
+            pass
+    return build_flashcards_meta(source_mtime_ns)
+
+def load_flashcards_meta() -> Dict:
+    """Load deck totals and categories without parsing the full card array
+
+    The meta file is rebuilt whenever flashcards.json has been modified
+    since it was written.
+    """
+    return _load_flashcards_meta(file_mtime_ns(FLASHCARDS_FILE))
+
+def flashcard_count() -> int:
+    """Number of cards in the deck, read from the meta file"""
+    return load_flashcards_meta()['total']
+
+# Rebuilt on every full rerun. Fragment reruns (card_viewer, answer_panel,
+# quiz_question_panel, timed_countdown) keep the globals of the last full
+# run and share this dict; every progress write goes through
+# clear_progress_cache(), so what they read here is never stale.
+RUN_MEMO: Dict[str, Dict] = {}
+
+STUDY_DB_SCHEMA = """
+CREATE TABLE IF NOT EXISTS daily_scores (
+    date TEXT PRIMARY KEY,
+    correct INTEGER NOT NULL DEFAULT 0,
+    incorrect INTEGER NOT NULL DEFAULT 0,
+    total INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS progress_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS srs_cards (
+    id TEXT PRIMARY KEY,
+    reviews INTEGER NOT NULL DEFAULT 0,
+    correct INTEGER NOT NULL DEFAULT 0,
+    ease_factor REAL NOT NULL DEFAULT 2.5,
+    interval INTEGER NOT NULL DEFAULT 1,
+    repetitions INTEGER NOT NULL DEFAULT 0,
+    last_review TEXT
+);
+"""
+PROGRESS_META_KEYS = ('total_studied', 'streak', 'last_study_date')
+# Fields of a card's SRS record, with the values a new card starts from
+SRS_CARD_DEFAULTS = {
+    'reviews': 0,
+    'correct': 0,
+    'ease_factor': 2.5,
+    'interval': 1,
+    'repetitions': 0,
+    'last_review': None
+}
+SRS_COLUMNS = tuple(SRS_CARD_DEFAULTS)
+
+@st.cache_resource(show_spinner=False)
+def get_db():
+    """Shared SQLite connection holding progress and SRS state
+
+    On first run the database is seeded from progress.json and
+    srs_data.json; after that single rows are upserted instead of
+    rewriting whole files.
+    """
     os.makedirs(DATA_DIR, exist_ok=True)
-    with open(PROGRESS_FILE, 'w', encoding='utf-8') as f:
-        json.dump(progress, f, indent=2)
+    is_new = not os.path.exists(STUDY_DB_FILE)
+    conn = sqlite3.connect(STUDY_DB_FILE, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(STUDY_DB_SCHEMA)
+    if is_new:
+        migrate_json_to_db(conn)
+    return conn
+
+@st.cache_resource(show_spinner=False)
+def get_db_lock() -> threading.Lock:
+    """Serializes use of the shared connection across sessions"""
+    return threading.Lock()
+
+def migrate_json_to_db(conn: sqlite3.Connection):
+    """Copy progress.json and srs_data.json into a freshly created database"""
+    progress = read_json(PROGRESS_FILE) if os.path.exists(PROGRESS_FILE) else {}
+    srs = read_json(SRS_FILE) if os.path.exists(SRS_FILE) else {}
+    with conn:
+        write_progress_rows(conn, progress)
+        write_srs_rows(conn, srs.get('cards', {}))
+
+def write_progress_rows(conn: sqlite3.Connection, progress: Dict):
+    conn.executemany(
+        "INSERT OR REPLACE INTO daily_scores (date, correct, incorrect, total) VALUES (?, ?, ?, ?)",
+        [(s['date'], s['correct'], s['incorrect'], s.get('total', s['correct'] + s['incorrect']))
+         for s in progress.get('daily_scores', [])]
+    )
+    write_progress_meta(conn, progress)
+
+def write_progress_meta(conn: sqlite3.Connection, progress: Dict):
+    conn.executemany(
+        "INSERT OR REPLACE INTO progress_meta (key, value) VALUES (?, ?)",
+        [(key, json.dumps(progress.get(key))) for key in PROGRESS_META_KEYS if key in progress]
+    )
+
+def write_srs_rows(conn: sqlite3.Connection, cards: Dict[str, Dict]):
+    conn.executemany(
+        f"INSERT OR REPLACE INTO srs_cards (id, {', '.join(SRS_COLUMNS)}) "
+        f"VALUES (?, {', '.join('?' for _ in SRS_COLUMNS)})",
+        [(str(card_id), *(card.get(col, SRS_CARD_DEFAULTS[col]) for col in SRS_COLUMNS))
+         for card_id, card in cards.items()]
+    )
+
+@st.cache_data(show_spinner=False)
+def _load_progress():
+    progress = {'daily_scores': [], 'total_studied': 0, 'streak': 0, 'last_study_date': None}
+    with get_db_lock():
+        conn = get_db()
+        progress['daily_scores'] = [
+            dict(row) for row in conn.execute(
+                "SELECT date, correct, incorrect, total FROM daily_scores ORDER BY date"
+            )
+        ]
+        for row in conn.execute("SELECT key, value FROM progress_meta"):
+            progress[row['key']] = json.loads(row['value'])
+    return progress
+
+def load_progress():
+    """Load user progress data (once per run, cached until the next write)"""
+    if 'progress' not in RUN_MEMO:
+        RUN_MEMO['progress'] = _load_progress()
+    return RUN_MEMO['progress']
+
+def clear_progress_cache(progress: Optional[Dict] = None):
+    """Drop cached progress after a write
+
+    Writers that hold the full, updated progress dict pass it in so the
+    rest of the run reuses it instead of reading it straight back.
+    """
+    _load_progress.clear()
+    if progress is None:
+        RUN_MEMO.pop('progress', None)
+    else:
+        RUN_MEMO['progress'] = progress
 
+def save_progress(progress):
+    """Replace all stored progress data"""
+    with get_db_lock():
+        conn = get_db()
+        with conn:
+            conn.execute("DELETE FROM daily_scores")
+            conn.execute("DELETE FROM progress_meta")
+            write_progress_rows(conn, progress)
+    clear_progress_cache(progress)
+
+def save_progress_meta(progress):
+    """Save the streak fields without touching the daily scores"""
+    with get_db_lock():
+        conn = get_db()
+        with conn:
+            write_progress_meta(conn, progress)
+    clear_progress_cache(progress)
+
+def add_daily_score(day: str, correct: int, incorrect: int):
+    """Add session results to a day's score row"""
+    with get_db_lock():
+        conn = get_db()
+        with conn:
+            conn.execute(
+                """
+                INSERT INTO daily_scores (date, correct, incorrect, total) VALUES (?, ?, ?, ?)
+                ON CONFLICT(date) DO UPDATE SET
+                    correct = correct + excluded.correct,
+                    incorrect = incorrect + excluded.incorrect,
+                    total = total + excluded.total
+                """,
+                (day, correct, incorrect, correct + incorrect)
+            )
+    clear_progress_cache()
+
+@st.cache_data(show_spinner=False)
 def load_srs_data():
-    """Load spaced repetition data"""
-    if os.path.exists(SRS_FILE):
-        with open(SRS_FILE, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    return {'cards': {}}
+    """Load spaced repetition data (cached until the next SRS write)"""
+    with get_db_lock():
+        rows = get_db().execute(f"SELECT id, {', '.join(SRS_COLUMNS)} FROM srs_cards").fetchall()
+    return {'cards': {row['id']: {col: row[col] for col in SRS_COLUMNS} for row in rows}}
 
 def save_srs_data(data):
-    """Save spaced repetition data"""
-    os.makedirs(DATA_DIR, exist_ok=True)
-    with open(SRS_FILE, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=2)
+    """Replace all stored spaced repetition data"""
+    with get_db_lock():
+        conn = get_db()
+        with conn:
+            conn.execute("DELETE FROM srs_cards")
+            write_srs_rows(conn, data.get('cards', {}))
+    load_srs_data.clear()
+
+def save_srs_cards(cards: Dict[str, Dict]):
+    """Upsert only the given SRS card records"""
+    with get_db_lock():
+        conn = get_db()
+        with conn:
+            write_srs_rows(conn, cards)
+    load_srs_data.clear()
 
 def reset_all_progress():
     """Reset all user progress data"""
@@ -108,59 +450,83 @@ def reset_all_progress():
     save_progress(empty_progress)
     save_srs_data(empty_srs)
     st.session_state.score = {'correct': 0, 'incorrect': 0}
+    st.session_state._pending_progress = {'correct': 0, 'incorrect': 0}
+    st.session_state.srs_data = empty_srs
+    st.session_state.srs_pending_writes = 0
+    st.session_state.srs_dirty_cards = set()
     st.session_state.study_streak = 0
-    st.session_state.bookmarked_cards = set()
+    st.session_state.bookmarked_cards = frozenset()
     st.session_state.current_card_index = 0
 
 # ============================================
 # ENHANCED MCAT QUESTION API FUNCTIONS
 # ============================================
-@st.cache_data(ttl=300)
-def fetch_mcat_questions(amount: int = 10, category: str = "all") -> List[Dict]:
-    """Fetch MCAT-relevant questions from multiple sources"""
-    questions = []
+TRIVIA_TIMEOUT = (2, 6)  # (connect, read) seconds
+TRIVIA_CACHE_TTL = 24 * 60 * 60  # Quizzes are sampled from the pool, so a daily refresh is plenty
+QUIZ_DEFAULT_QUESTIONS = 10
+QUIZ_MAX_QUESTIONS = 50  # Also the per-API batch size of the cached question pool
+
+# OpenTDB categories relevant to MCAT; anything else uses Science & Nature
+MCAT_OPENTDB_CATEGORIES = {
+    'biology': 17,      # Science & Nature
+    'chemistry': 17,    # Science & Nature
+    'physics': 17,      # Science & Nature
+    'psychology': 17,   # Science & Nature (closest match)
+}
+OPENTDB_DEFAULT_CATEGORY = 17
+
+
+@st.cache_resource
+def get_http_session() -> requests.Session:
+    """Shared HTTP session that keeps connections alive and backs off on rate limits
+
+    Cached as a resource because app.py re-executes on every rerun, which
+    would otherwise throw away the connection pool each time.
+    """
+    session = requests.Session()
+    session.headers.update({'User-Agent': 'MCAT-StudyHub/1.0'})
+    retry = Retry(total=2, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504])
+    session.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=retry))
+    return session
 
-    # OpenTDB categories relevant to MCAT
-    mcat_categories = {
-        'biology': 17,      # Science & Nature
-        'chemistry': 17,    # Science & Nature
-        'physics': 17,      # Science & Nature
-        'psychology': 17,   # Science & Nature (closest match)
-    }
 
-    # Try Open Trivia DB first
+def _fetch_opentdb(session: requests.Session, amount: int, category: str = "all") -> List[MCQ]:
+    """Multiple-choice science questions from Open Trivia DB ([] on failure)"""
+    questions = []
+    opentdb_category = MCAT_OPENTDB_CATEGORIES.get(category, OPENTDB_DEFAULT_CATEGORY)
     try:
-        response = requests.get(
-            f"https://opentdb.com/api.php?amount={amount}&category=17&type=multiple",
-            timeout=10
+        response = session.get(
+            f"https://opentdb.com/api.php?amount={amount}&category={opentdb_category}&type=multiple",
+            timeout=TRIVIA_TIMEOUT
         )
-        data = response.json()
+        data = parse_json(response.content)
         if data.get("response_code") == 0:
+            unescape = html.unescape
             for q in data.get("results", []):
-                answers = [html.unescape(q["correct_answer"])] + [html.unescape(a) for a in q["incorrect_answers"]]
-                random.shuffle(answers)
-                questions.append({
-                    "question": html.unescape(q["question"]),
-                    "correct_answer": html.unescape(q["correct_answer"]),
-                    "options": answers,
-                    "difficulty": q["difficulty"],
-                    "category": "Science",
-                    "source": "OpenTDB"
-                })
-    except Exception:
+                correct_answer = unescape(q["correct_answer"])
+                questions.append(MCQ(
+                    question=unescape(q["question"]),
+                    correct_answer=correct_answer,
+                    options=(correct_answer, *map(unescape, q["incorrect_answers"])),
+                    difficulty=q["difficulty"],
+                    category="Science",
+                    source="OpenTDB"
+                ))
+    except (requests.RequestException, ValueError, KeyError):
         pass
+    return questions
 
-    # Try The Trivia API as backup
+def _fetch_trivia_api(session: requests.Session, amount: int) -> List[MCQ]:
+    """Science questions from The Trivia API ([] on failure)"""
+    questions = []
     try:
-        response = requests.get(
+        response = session.get(
             f"https://the-trivia-api.com/v2/questions?limit={amount}&categories=science",
-            timeout=10
+            timeout=TRIVIA_TIMEOUT
         )
         if response.status_code == 200:
-            data = response.json()
+            data = parse_json(response.content)
             for q in data:
-                answers = [q.get("correctAnswer", "")] + q.get("incorrectAnswers", [])
-                random.shuffle(answers)
                 # Handle question being either a string or an object with 'text' field
                 question_data = q.get("question", "")
                 if isinstance(question_data, dict):
@@ -169,20 +535,98 @@ def fetch_mcat_questions(amount: int = 10, category: str = "all") -> List[Dict]:
                     question_text = str(question_data)
 
                 if question_text and q.get("correctAnswer"):
-                    questions.append({
-                        "question": question_text,
-                        "correct_answer": q.get("correctAnswer", ""),
-                        "options": answers,
-                        "difficulty": q.get("difficulty", "medium"),
-                        "category": q.get("category", "Science"),
-                        "source": "TriviaAPI"
-                    })
-    except Exception:
+                    questions.append(MCQ(
+                        question=question_text,
+                        correct_answer=q.get("correctAnswer", ""),
+                        options=(q.get("correctAnswer", ""), *q.get("incorrectAnswers", [])),
+                        difficulty=q.get("difficulty", "medium"),
+                        category=q.get("category", "Science"),
+                        source="TriviaAPI"
+                    ))
+    except (requests.RequestException, ValueError, KeyError):
+        pass
+    return questions
+
+class QuestionPoolUnavailable(Exception):
+    """Both trivia APIs returned nothing"""
+
+
+@st.cache_data(ttl=TRIVIA_CACHE_TTL, max_entries=32, show_spinner=False)
+def fetch_question_pool(category: str = "all", amount: int = QUIZ_MAX_QUESTIONS) -> Tuple[MCQ, ...]:
+    """Fetch MCAT-relevant questions from multiple sources
+
+    Both APIs are queried at once, so a slow or failing source costs its
+    own timeout rather than adding to the other's. One large batch is
+    cached for a day and shared by every quiz size, and also written to
+    disk as the last known good pool.
+
+    Raises QuestionPoolUnavailable when both sources come back empty;
+    st.cache_data doesn't cache exceptions, so the next call retries the
+    network instead of reusing an empty pool for a day.
+    """
+    session = get_http_session()
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        sources = [
+            executor.submit(_fetch_opentdb, session, amount, category),
+            executor.submit(_fetch_trivia_api, session, amount),
+        ]
+        questions = [q for source in sources for q in source.result()]
+
+    if not questions:
+        raise QuestionPoolUnavailable(category)
+    try:
+        write_json(TRIVIA_CACHE_FILE, [q._asdict() for q in questions])
+    except OSError:
         pass
+    return tuple(questions)
+
+def load_question_pool(category: str = "all") -> Tuple[MCQ, ...]:
+    """Question pool for a quiz, falling back to the last known good batch
 
-    # Shuffle and return requested amount
-    random.shuffle(questions)
-    return questions[:amount] if questions else []
+    Tries the cached fetch first, then the pool this session last loaded,
+    then the copy on disk; () only when all three are unavailable.
+    """
+    try:
+        pool = fetch_question_pool(category)
+    except QuestionPoolUnavailable:
+        if st.session_state._last_questions:
+            return st.session_state._last_questions
+        try:
+            return tuple(MCQ(**q) for q in read_json(TRIVIA_CACHE_FILE))
+        except (OSError, ValueError, TypeError):
+            return ()
+    st.session_state._last_questions = pool
+    return pool
+
+def fetch_mcat_questions(amount: int = 10, category: str = "all") -> List[MCQ]:
+    """Draw a quiz from the question pool
+
+    The pool stores options correct-answer first. Sampling and shuffling
+    happen here, outside the cache, so each quiz gets a fresh selection
+    and option order without another network call.
+    """
+    pool = load_question_pool(category)
+    return [
+        q._replace(options=tuple(random.sample(q.options, len(q.options))))
+        for q in random.sample(pool, min(amount, len(pool)))
+    ]
+
+def prefetch_quiz_questions():
+    """Warm the fetch_question_pool cache in the background
+
+    Started on login so starting a quiz of any size is a cache hit
+    instead of a blocking network call.
+    """
+    def warm():
+        try:
+            # Same positional args as load_question_pool, or the cache keys differ
+            fetch_question_pool("all")
+        except QuestionPoolUnavailable:
+            pass  # Nothing cached; the quiz retries when it starts
+
+    thread = threading.Thread(target=warm, daemon=True)
+    add_script_run_ctx(thread)
+    thread.start()
 
 # ============================================
 # MCAT STUDY RESOURCES
@@ -220,115 +664,135 @@ MCAT_RESOURCES = {
     ],
 }
 
+RESOURCE_CARD_TPL = string.Template(
+    '<div class="resource-card">'
+    '<a href="${url}" target="_blank" class="resource-link">🔗 ${name}</a>'
+    '<div style="color: var(--text-secondary); font-size: 0.85rem; margin-top: 0.25rem;">${desc}</div>'
+    '</div>'
+)
+
+# The resource list never changes, so each category's cards are rendered once at import
+RESOURCES_HTML = {
+    category: "".join(
+        RESOURCE_CARD_TPL.substitute(
+            url=html.escape(r['url']), name=html.escape(r['name']), desc=html.escape(r['desc'])
+        )
+        for r in resources
+    )
+    for category, resources in MCAT_RESOURCES.items()
+}
+
 # ============================================
 # CUSTOM CSS - Beautiful Modern Design (Dark Mode Only)
 # ============================================
-def load_css():
-    """Load custom CSS for beautiful styling"""
-    bg_primary = "#1a1a2e"
-    bg_secondary = "#16213e"
-    bg_card = "#1f2937"
-    text_primary = "#ffffff"
-    text_secondary = "#a0aec0"
-    accent = "#8b5cf6"
-    accent_light = "#a78bfa"
-    success = "#10b981"
-    danger = "#ef4444"
-    warning = "#f59e0b"
-    border_color = "#374151"
-
-    st.markdown(f"""
+# Dark mode palette, exposed to the stylesheet as CSS custom properties
+THEME_COLORS = {
+    'bg-primary': "#1a1a2e",
+    'bg-secondary': "#16213e",
+    'bg-card': "#1f2937",
+    'text-primary': "#ffffff",
+    'text-secondary': "#a0aec0",
+    'accent': "#8b5cf6",
+    'accent-light': "#a78bfa",
+    'success': "#10b981",
+    'danger': "#ef4444",
+    'warning': "#f59e0b",
+    'border-color': "#374151",
+}
+
+# Colors are referenced through var(--...), so this never needs formatting
+STATIC_CSS = """
     <style>
     /* Import Google Fonts */
     @import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700;800&family=Poppins:wght@400;500;600;700;800&display=swap');
 
     /* Global Styles */
-    .stApp {{
-        background: {bg_primary};
+    .stApp {
+        background: var(--bg-primary);
         font-family: 'Inter', sans-serif;
-    }}
+    }
 
     /* Hide Streamlit elements */
-    #MainMenu {{visibility: hidden;}}
-    footer {{visibility: hidden;}}
-    header {{visibility: hidden;}}
+    #MainMenu {visibility: hidden;}
+    footer {visibility: hidden;}
+    header {visibility: hidden;}
 
     /* Custom scrollbar */
-    ::-webkit-scrollbar {{
+    ::-webkit-scrollbar {
         width: 8px;
         height: 8px;
-    }}
-    ::-webkit-scrollbar-track {{
-        background: {bg_secondary};
-    }}
-    ::-webkit-scrollbar-thumb {{
-        background: {accent};
+    }
+    ::-webkit-scrollbar-track {
+        background: var(--bg-secondary);
+    }
+    ::-webkit-scrollbar-thumb {
+        background: var(--accent);
         border-radius: 4px;
-    }}
+    }
 
     /* Form Input Styling */
-    .stTextInput > div > div > input {{
-        background: {bg_secondary} !important;
-        border: 2px solid {border_color} !important;
+    .stTextInput > div > div > input {
+        background: var(--bg-secondary) !important;
+        border: 2px solid var(--border-color) !important;
         border-radius: 12px !important;
         padding: 0.75rem 1rem !important;
-        color: {text_primary} !important;
+        color: var(--text-primary) !important;
         font-size: 1rem !important;
-    }}
+    }
 
-    .stTextInput > div > div > input:focus {{
-        border-color: {accent} !important;
+    .stTextInput > div > div > input:focus {
+        border-color: var(--accent) !important;
         box-shadow: 0 0 0 3px rgba(139, 92, 246, 0.2) !important;
-    }}
+    }
 
-    .stTextInput > div > div > input::placeholder {{
-        color: {text_secondary} !important;
+    .stTextInput > div > div > input::placeholder {
+        color: var(--text-secondary) !important;
         opacity: 0.7 !important;
-    }}
+    }
 
     /* Primary Button Styling */
-    .stButton > button[kind="primary"] {{
-        background: linear-gradient(135deg, {accent} 0%, #7c3aed 100%) !important;
+    .stButton > button[kind="primary"] {
+        background: linear-gradient(135deg, var(--accent) 0%, #7c3aed 100%) !important;
         border: none !important;
         border-radius: 12px !important;
         padding: 0.75rem 1.5rem !important;
         font-weight: 600 !important;
         transition: all 0.3s ease !important;
-    }}
+    }
 
-    .stButton > button[kind="primary"]:hover {{
+    .stButton > button[kind="primary"]:hover {
         transform: translateY(-2px) !important;
         box-shadow: 0 10px 20px rgba(139, 92, 246, 0.3) !important;
-    }}
+    }
 
     /* Regular Button Styling */
-    .stButton > button {{
-        background: {bg_card} !important;
-        border: 2px solid {border_color} !important;
+    .stButton > button {
+        background: var(--bg-card) !important;
+        border: 2px solid var(--border-color) !important;
         border-radius: 12px !important;
-        color: {text_primary} !important;
+        color: var(--text-primary) !important;
         padding: 0.75rem 1.5rem !important;
         font-weight: 500 !important;
         transition: all 0.3s ease !important;
-    }}
+    }
 
-    .stButton > button:hover {{
-        border-color: {accent} !important;
+    .stButton > button:hover {
+        border-color: var(--accent) !important;
         transform: translateY(-2px) !important;
-    }}
+    }
 
     /* Main Header */
-    .main-header {{
-        background: linear-gradient(135deg, {accent} 0%, #ec4899 100%);
+    .main-header {
+        background: linear-gradient(135deg, var(--accent) 0%, #ec4899 100%);
         padding: 2rem 3rem;
         border-radius: 20px;
         margin-bottom: 2rem;
         color: white;
         position: relative;
         overflow: hidden;
-    }}
+    }
 
-    .main-header::before {{
+    .main-header::before {
         content: '';
         position: absolute;
         top: -50%;
@@ -336,60 +800,60 @@ def load_css():
         width: 100%;
         height: 200%;
         background: radial-gradient(circle, rgba(255,255,255,0.1) 0%, transparent 70%);
-    }}
+    }
 
-    .header-content {{
+    .header-content {
         position: relative;
         z-index: 1;
-    }}
+    }
 
-    .header-greeting {{
+    .header-greeting {
         font-family: 'Poppins', sans-serif;
         font-size: 1.5rem;
         font-weight: 600;
         margin-bottom: 0.25rem;
-    }}
+    }
 
-    .header-title {{
+    .header-title {
         font-family: 'Poppins', sans-serif;
         font-size: 2.5rem;
         font-weight: 800;
         margin-bottom: 0.5rem;
-    }}
+    }
 
-    .header-subtitle {{
+    .header-subtitle {
         font-size: 1.1rem;
         opacity: 0.9;
-    }}
+    }
 
     /* Navigation Cards */
-    .nav-grid {{
+    .nav-grid {
         display: grid;
         grid-template-columns: repeat(auto-fit, minmax(280px, 1fr));
         gap: 1.5rem;
         margin-bottom: 2rem;
-    }}
+    }
 
-    .nav-card {{
-        background: {bg_card};
+    .nav-card {
+        background: var(--bg-card);
         border-radius: 20px;
         padding: 2rem;
         cursor: pointer;
         transition: all 0.3s cubic-bezier(0.4, 0, 0.2, 1);
-        border: 2px solid {border_color};
+        border: 2px solid var(--border-color);
         position: relative;
         overflow: hidden;
-    }}
+    }
 
-    .nav-card:hover {{
+    .nav-card:hover {
         transform: translateY(-8px);
         box-shadow: 0 20px 40px rgba(139, 92, 246, 0.15);
-        border-color: {accent};
-    }}
+        border-color: var(--accent);
+    }
 
     /* Flashcard Styles */
-    .flashcard {{
-        background: {bg_card};
+    .flashcard {
+        background: var(--bg-card);
         border-radius: 24px;
         padding: 3rem;
         min-height: 350px;
@@ -398,178 +862,178 @@ def load_css():
         justify-content: center;
         align-items: center;
         box-shadow: 0 10px 40px rgba(0,0,0,0.1);
-        border: 2px solid {border_color};
+        border: 2px solid var(--border-color);
         transition: all 0.3s ease;
         position: relative;
-    }}
+    }
 
-    .flashcard:hover {{
+    .flashcard:hover {
         box-shadow: 0 20px 60px rgba(139, 92, 246, 0.15);
-        border-color: {accent};
-    }}
+        border-color: var(--accent);
+    }
 
-    .flashcard-category {{
+    .flashcard-category {
         position: absolute;
         top: 1.5rem;
         left: 1.5rem;
         display: flex;
         align-items: center;
         gap: 0.5rem;
-    }}
+    }
 
-    .category-badge {{
+    .category-badge {
         padding: 0.4rem 1rem;
         border-radius: 20px;
         font-size: 0.85rem;
         font-weight: 600;
         color: white;
-    }}
+    }
 
-    .badge-bio {{ background: linear-gradient(135deg, #10b981 0%, #059669 100%); }}
-    .badge-chem {{ background: linear-gradient(135deg, #3b82f6 0%, #1d4ed8 100%); }}
-    .badge-physics {{ background: linear-gradient(135deg, #f59e0b 0%, #d97706 100%); }}
-    .badge-psych {{ background: linear-gradient(135deg, #8b5cf6 0%, #7c3aed 100%); }}
+    .badge-bio { background: linear-gradient(135deg, #10b981 0%, #059669 100%); }
+    .badge-chem { background: linear-gradient(135deg, #3b82f6 0%, #1d4ed8 100%); }
+    .badge-physics { background: linear-gradient(135deg, #f59e0b 0%, #d97706 100%); }
+    .badge-psych { background: linear-gradient(135deg, #8b5cf6 0%, #7c3aed 100%); }
 
-    .high-yield-badge {{
+    .high-yield-badge {
         background: linear-gradient(135deg, #ef4444 0%, #dc2626 100%);
         color: white;
         padding: 0.3rem 0.8rem;
         border-radius: 20px;
         font-size: 0.75rem;
         font-weight: 700;
-    }}
+    }
 
-    .flashcard-question {{
+    .flashcard-question {
         font-family: 'Poppins', sans-serif;
         font-size: 1.5rem;
         font-weight: 600;
-        color: {text_primary};
+        color: var(--text-primary);
         text-align: center;
         line-height: 1.6;
         max-width: 600px;
-    }}
+    }
 
-    .flashcard-answer {{
+    .flashcard-answer {
         background: linear-gradient(135deg, #1e3a2f 0%, #1a2e26 100%);
         border-radius: 16px;
         padding: 1.5rem 2rem;
         margin-top: 1.5rem;
         max-width: 600px;
-        border-left: 4px solid {success};
+        border-left: 4px solid var(--success);
         width: 100%;
-    }}
+    }
 
-    .flashcard-answer-text {{
+    .flashcard-answer-text {
         font-size: 1.1rem;
         color: #a7f3d0;
         line-height: 1.6;
-    }}
+    }
 
     /* Stats Cards */
-    .stats-grid {{
+    .stats-grid {
         display: grid;
         grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
         gap: 1.5rem;
         margin: 2rem 0;
-    }}
+    }
 
-    .stat-card {{
-        background: {bg_card};
+    .stat-card {
+        background: var(--bg-card);
         border-radius: 20px;
         padding: 1.5rem;
         text-align: center;
-        border: 2px solid {border_color};
+        border: 2px solid var(--border-color);
         transition: all 0.3s ease;
-    }}
+    }
 
-    .stat-card:hover {{
+    .stat-card:hover {
         transform: translateY(-4px);
-        border-color: {accent};
-    }}
+        border-color: var(--accent);
+    }
 
-    .stat-icon {{
+    .stat-icon {
         font-size: 2.5rem;
         margin-bottom: 0.5rem;
-    }}
+    }
 
-    .stat-value {{
+    .stat-value {
         font-family: 'Poppins', sans-serif;
         font-size: 2.5rem;
         font-weight: 800;
-        color: {accent};
+        color: var(--accent);
         line-height: 1;
-    }}
+    }
 
-    .stat-label {{
-        color: {text_secondary};
+    .stat-label {
+        color: var(--text-secondary);
         font-size: 0.9rem;
         margin-top: 0.5rem;
-    }}
+    }
 
     /* Progress Bar */
-    .progress-container {{
-        background: {border_color};
+    .progress-container {
+        background: var(--border-color);
         border-radius: 10px;
         height: 12px;
         overflow: hidden;
         margin: 1rem 0;
-    }}
+    }
 
-    .progress-bar {{
+    .progress-bar {
         height: 100%;
-        background: linear-gradient(90deg, {accent} 0%, #ec4899 100%);
+        background: linear-gradient(90deg, var(--accent) 0%, #ec4899 100%);
         border-radius: 10px;
         transition: width 0.5s ease;
-    }}
+    }
 
     /* Timer */
-    .timer-display {{
+    .timer-display {
         font-family: 'Poppins', sans-serif;
         font-size: 4rem;
         font-weight: 800;
-        color: {accent};
+        color: var(--accent);
         text-align: center;
         padding: 2rem;
-        background: {bg_card};
+        background: var(--bg-card);
         border-radius: 20px;
-        border: 3px solid {border_color};
-    }}
+        border: 3px solid var(--border-color);
+    }
 
-    .timer-warning {{ color: {warning} !important; }}
-    .timer-danger {{ color: {danger} !important; animation: pulse 1s infinite; }}
+    .timer-warning { color: var(--warning) !important; }
+    .timer-danger { color: var(--danger) !important; animation: pulse 1s infinite; }
 
-    @keyframes pulse {{
-        0%, 100% {{ opacity: 1; }}
-        50% {{ opacity: 0.5; }}
-    }}
+    @keyframes pulse {
+        0%, 100% { opacity: 1; }
+        50% { opacity: 0.5; }
+    }
 
     /* Resource Cards */
-    .resource-card {{
-        background: {bg_card};
+    .resource-card {
+        background: var(--bg-card);
         border-radius: 12px;
         padding: 1rem 1.25rem;
-        border: 1px solid {border_color};
+        border: 1px solid var(--border-color);
         margin-bottom: 0.75rem;
         transition: all 0.2s ease;
-    }}
+    }
 
-    .resource-card:hover {{
-        border-color: {accent};
+    .resource-card:hover {
+        border-color: var(--accent);
         transform: translateX(5px);
-    }}
+    }
 
-    .resource-link {{
-        color: {accent_light};
+    .resource-link {
+        color: var(--accent-light);
         text-decoration: none;
         font-weight: 600;
-    }}
+    }
 
-    .resource-link:hover {{
-        color: {accent};
-    }}
+    .resource-link:hover {
+        color: var(--accent);
+    }
 
     /* Popup/Modal Styling */
-    .popup-overlay {{
+    .popup-overlay {
         position: fixed;
         top: 0;
         left: 0;
@@ -580,77 +1044,104 @@ def load_css():
         align-items: center;
         justify-content: center;
         z-index: 9999;
-    }}
+    }
 
-    .popup-content {{
-        background: {bg_card};
+    .popup-content {
+        background: var(--bg-card);
         border-radius: 24px;
         padding: 2.5rem;
         max-width: 550px;
         margin: 1rem;
-        border: 2px solid {accent};
+        border: 2px solid var(--accent);
         box-shadow: 0 25px 50px rgba(139, 92, 246, 0.3);
-    }}
+    }
 
     /* Metric Cards */
-    [data-testid="stMetric"] {{
-        background: {bg_card};
+    [data-testid="stMetric"] {
+        background: var(--bg-card);
         padding: 1rem;
         border-radius: 16px;
-        border: 2px solid {border_color};
+        border: 2px solid var(--border-color);
         text-align: center;
-    }}
+    }
 
-    [data-testid="stMetricLabel"] {{ color: {text_secondary} !important; }}
-    [data-testid="stMetricValue"] {{ color: {accent} !important; font-family: 'Poppins', sans-serif !important; font-weight: 700 !important; }}
+    [data-testid="stMetricLabel"] { color: var(--text-secondary) !important; }
+    [data-testid="stMetricValue"] { color: var(--accent) !important; font-family: 'Poppins', sans-serif !important; font-weight: 700 !important; }
 
     /* Selectbox Styling */
-    .stSelectbox > div > div {{
-        background: {bg_card} !important;
-        border: 2px solid {border_color} !important;
+    .stSelectbox > div > div {
+        background: var(--bg-card) !important;
+        border: 2px solid var(--border-color) !important;
         border-radius: 12px !important;
-    }}
+    }
 
-    .stSelectbox > div > div:hover {{ border-color: {accent} !important; }}
+    .stSelectbox > div > div:hover { border-color: var(--accent) !important; }
 
     /* Center alignment for main content */
-    .block-container {{
+    .block-container {
         max-width: 1200px !important;
         padding: 1rem 2rem !important;
         padding-top: 0.5rem !important;
-    }}
+    }
 
     /* Reduce top padding for login page */
-    .stApp > header + div {{
+    .stApp > header + div {
         padding-top: 0 !important;
-    }}
+    }
 
     /* Responsive adjustments */
-    @media (max-width: 768px) {{
-        .main-header {{ padding: 1.5rem; }}
-        .header-title {{ font-size: 1.8rem; }}
-        .flashcard {{ padding: 2rem; min-height: 280px; }}
-        .flashcard-question {{ font-size: 1.2rem; }}
-        .block-container {{ padding: 0.5rem !important; }}
-    }}
+    @media (max-width: 768px) {
+        .main-header { padding: 1.5rem; }
+        .header-title { font-size: 1.8rem; }
+        .flashcard { padding: 2rem; min-height: 280px; }
+        .flashcard-question { font-size: 1.2rem; }
+        .block-container { padding: 0.5rem !important; }
+    }
     </style>
-    """, unsafe_allow_html=True)
+    """
+
+
+def minify_css(css: str) -> str:
+    """Drop comments and collapse whitespace in a stylesheet"""
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.DOTALL)
+    css = re.sub(r"\s+", " ", css)
+    return re.sub(r"\s*([{};,>])\s*", r"\1", css).strip()
+
+
+@st.cache_resource
+def build_css() -> str:
+    """Build the custom stylesheet once; the palette is fixed (dark mode only)
+
+    Only the small :root block of color variables is generated; the rest
+    of the stylesheet is the constant STATIC_CSS, minified here so each
+    rerun ships the smaller string.
+    """
+    declarations = " ".join(f"--{name}: {value};" for name, value in THEME_COLORS.items())
+    return minify_css(f"<style>:root {{ {declarations} }}</style>" + STATIC_CSS)
+
+
+def load_css():
+    """Load custom CSS for beautiful styling"""
+    st.markdown(build_css(), unsafe_allow_html=True)
 
 
 # ============================================
 # LOGIN PAGE - Compact, No Scrollbar
 # ============================================
-def login_page():
-    """Compact login page that fits without scrolling"""
-    load_css()
+# SHA-256 of "<email>\n<access code>" for the one valid login
+LOGIN_DIGEST = bytes.fromhex("7cbc3539c80bc0168b0c7658051c9184b418ac60edfb08c48ccbcba23c61b0dc")
+
 
-    bg_card = "#1f2937"
-    text_primary = "#ffffff"
-    text_secondary = "#a0aec0"
-    border_color = "#374151"
+def check_credentials(email: str, password: str) -> bool:
+    """Constant-time check of a login attempt against LOGIN_DIGEST"""
+    provided = hashlib.sha256(f"{email}\n{password}".encode('utf-8')).digest()
+    return hmac.compare_digest(provided, LOGIN_DIGEST)
 
+
+def login_page():
+    """Compact login page that fits without scrolling"""
     # Compact Login Container - balanced padding
-    st.markdown(f"""
+    st.markdown("""
     <div style="
         display: flex;
         flex-direction: column;
@@ -663,10 +1154,10 @@ def login_page():
             max-width: 400px;
             width: 100%;
             padding: 2rem;
-            background: {bg_card};
+            background: var(--bg-card);
             border-radius: 24px;
             box-shadow: 0 25px 50px -12px rgba(0,0,0,0.4);
-            border: 1px solid {border_color};
+            border: 1px solid var(--border-color);
             text-align: center;
         ">
             <div style="font-size: 3rem; margin-bottom: 0.5rem;">🩺</div>
@@ -674,10 +1165,10 @@ def login_page():
                 font-family: 'Poppins', sans-serif;
                 font-size: 1.5rem;
                 font-weight: 700;
-                color: {text_primary};
+                color: var(--text-primary);
                 margin-bottom: 0.3rem;
             ">MCAT Study Hub</div>
-            <div style="color: {text_secondary}; font-size: 0.9rem;">
+            <div style="color: var(--text-secondary); font-size: 0.9rem;">
                 Your personal MCAT preparation companion
             </div>
         </div>
@@ -695,20 +1186,25 @@ def login_page():
             submit = st.form_submit_button("Sign In →", use_container_width=True, type="primary")
 
             if submit:
-                if email == "ahkaur77@gmail.com" and password == "IloveyouArsh":
+                if check_credentials(email, password):
                     st.session_state.authenticated = True
                     st.session_state.current_page = 'home'
                     st.session_state.show_welcome_popup = True  # Show dedication popup
                     update_streak()
-                    st.balloons()
+                    prefetch_quiz_questions()
+                    preload_progress_page()
+                    # Celebrate the first sign-in only; later logins go straight in
+                    if not st.session_state._has_celebrated:
+                        st.session_state._has_celebrated = True
+                        st.balloons()
                     st.rerun()
                 else:
                     st.error("❌ Invalid credentials. Please try again.")
 
     # Minimal footer
-    st.markdown(f"""
+    st.markdown("""
     <div style="text-align: center; margin-top: 1rem;">
-        <div style="color: {text_secondary}; font-size: 0.8rem;">
+        <div style="color: var(--text-secondary); font-size: 0.8rem;">
             Made with 💜 for Arsh
         </div>
     </div>
@@ -718,63 +1214,63 @@ def login_page():
 # ============================================
 # DEDICATION POPUP (Shows after login)
 # ============================================
-def show_dedication_popup():
-    """Show beautiful dedication popup after login"""
-    text_primary = "#ffffff"
-    text_secondary = "#a0aec0"
-
-    st.markdown(f"""
+DEDICATION_HTML = """
+<div style="
+    background: linear-gradient(135deg, rgba(139, 92, 246, 0.2) 0%, rgba(236, 72, 153, 0.2) 100%);
+    border: 2px solid rgba(139, 92, 246, 0.5);
+    border-radius: 24px;
+    padding: 2rem;
+    margin: 1rem auto;
+    max-width: 620px;
+    text-align: center;
+">
+    <div style="font-size: 2.5rem; margin-bottom: 0.75rem;">💜</div>
     <div style="
-        background: linear-gradient(135deg, rgba(139, 92, 246, 0.2) 0%, rgba(236, 72, 153, 0.2) 100%);
-        border: 2px solid rgba(139, 92, 246, 0.5);
-        border-radius: 24px;
-        padding: 2rem;
-        margin: 1rem auto;
-        max-width: 620px;
-        text-align: center;
+        font-family: 'Poppins', sans-serif;
+        font-size: 1.6rem;
+        font-weight: 700;
+        background: linear-gradient(135deg, #8b5cf6 0%, #ec4899 100%);
+        -webkit-background-clip: text;
+        -webkit-text-fill-color: transparent;
+        background-clip: text;
+        margin-bottom: 1rem;
     ">
-        <div style="font-size: 2.5rem; margin-bottom: 0.75rem;">💜</div>
-        <div style="
-            font-family: 'Poppins', sans-serif;
-            font-size: 1.6rem;
-            font-weight: 700;
-            background: linear-gradient(135deg, #8b5cf6 0%, #ec4899 100%);
-            -webkit-background-clip: text;
-            -webkit-text-fill-color: transparent;
-            background-clip: text;
-            margin-bottom: 1rem;
-        ">
-            For My Dearest Arsh
-        </div>
-        <div style="
-            color: {text_secondary};
-            font-size: 0.95rem;
-            line-height: 1.8;
-            font-style: italic;
-            margin-bottom: 1.25rem;
-            text-align: left;
-            padding: 0 0.5rem;
-        ">
-            I know things haven't been easy between us, and I'm truly sorry for the pain I've caused
-            these last few days. I've been working on this for quite some time now to help you study
-            for your MCAT exam later this summer.
-            <br><br>
-            I wanted to bring together all the materials, flashcards, and study tools in one place
-            to help you prepare and keep track of your progress. I know I live far away, but my
-            heart is always with you.
-            <br><br>
-            This isn't just a study tool, it's a reminder of how much I believe in you and your
-            dreams. You're going to absolutely crush the MCAT, and I'll always be cheering for you
-            from wherever I am.
-            <br><br>
-            <div style="text-align: center;">
-                <span style="color: #8b5cf6; font-weight: 600;">With all my love and apologies,</span>
-                <br>
-                <span style="color: #ec4899; font-weight: 700; font-size: 1.05rem;">Forever Your Bestie (Aman) 💜</span>
-            </div>
+        For My Dearest Arsh
+    </div>
+    <div style="
+        color: var(--text-secondary);
+        font-size: 0.95rem;
+        line-height: 1.8;
+        font-style: italic;
+        margin-bottom: 1.25rem;
+        text-align: left;
+        padding: 0 0.5rem;
+    ">
+        I know things haven't been easy between us, and I'm truly sorry for the pain I've caused
+        these last few days. I've been working on this for quite some time now to help you study
+        for your MCAT exam later this summer.
+        <br><br>
+        I wanted to bring together all the materials, flashcards, and study tools in one place
+        to help you prepare and keep track of your progress. I know I live far away, but my
+        heart is always with you.
+        <br><br>
+        This isn't just a study tool, it's a reminder of how much I believe in you and your
+        dreams. You're going to absolutely crush the MCAT, and I'll always be cheering for you
+        from wherever I am.
+        <br><br>
+        <div style="text-align: center;">
+            <span style="color: #8b5cf6; font-weight: 600;">With all my love and apologies,</span>
+            <br>
+            <span style="color: #ec4899; font-weight: 700; font-size: 1.05rem;">Forever Your Bestie (Aman) 💜</span>
         </div>
     </div>
-    """, unsafe_allow_html=True)
+</div>
+"""
+
+
+def show_dedication_popup():
+    """Show beautiful dedication popup after login"""
+    st.markdown(DEDICATION_HTML, unsafe_allow_html=True)
 
     col1, col2, col3 = st.columns([1, 1, 1])
     with col2:
@@ -783,33 +1279,52 @@ def show_dedication_popup():
             st.rerun()
 
 
+# ============================================
+# PAGE HEADER COMPONENT
+# ============================================
+PAGE_HEADER_TPL = string.Template("""
+<div class="main-header" style="padding: 1.5rem 2rem;">
+    <div class="header-content">
+        <div class="header-title" style="font-size: 2rem;">${title}</div>
+        <div class="header-subtitle">${subtitle}</div>
+    </div>
+</div>
+""")
+
+
+def render_page_header(title: str, subtitle: str):
+    """Render the compact gradient header shown at the top of each study page"""
+    st.markdown(PAGE_HEADER_TPL.substitute(title=title, subtitle=subtitle), unsafe_allow_html=True)
+
+
 # ============================================
 # LOVE FOOTER COMPONENT
 # ============================================
+LOVE_FOOTER_TPL = string.Template("""
+<div style="
+    max-width: 550px;
+    margin: 1rem auto 2rem auto;
+    padding: 1.25rem 1.5rem;
+    text-align: center;
+    background: linear-gradient(135deg, rgba(139, 92, 246, 0.1) 0%, rgba(236, 72, 153, 0.1) 100%);
+    border-radius: 16px;
+    border: 1px solid rgba(139, 92, 246, 0.2);
+">
+    <div style="font-size: 1.25rem; margin-bottom: 0.4rem;">💜</div>
+    <div style="color: var(--text-secondary); font-size: 0.9rem; line-height: 1.5;">
+        ${message}
+    </div>
+    <div style="color: #ec4899; font-size: 0.8rem; margin-top: 0.4rem; font-style: italic;">
+        With love for you, Arsh 💜
+    </div>
+</div>
+""")
+
+
 def render_love_footer(message: str = "I believe in you. I'm sorry and I love you."):
     """Render a beautiful love footer with custom message"""
-    text_secondary = "#a0aec0"
-
     st.markdown("---")
-    st.markdown(f"""
-    <div style="
-        max-width: 550px;
-        margin: 1rem auto 2rem auto;
-        padding: 1.25rem 1.5rem;
-        text-align: center;
-        background: linear-gradient(135deg, rgba(139, 92, 246, 0.1) 0%, rgba(236, 72, 153, 0.1) 100%);
-        border-radius: 16px;
-        border: 1px solid rgba(139, 92, 246, 0.2);
-    ">
-        <div style="font-size: 1.25rem; margin-bottom: 0.4rem;">💜</div>
-        <div style="color: {text_secondary}; font-size: 0.9rem; line-height: 1.5;">
-            {message}
-        </div>
-        <div style="color: #ec4899; font-size: 0.8rem; margin-top: 0.4rem; font-style: italic;">
-            With love for you, Arsh 💜
-        </div>
-    </div>
-    """, unsafe_allow_html=True)
+    st.markdown(LOVE_FOOTER_TPL.substitute(message=message), unsafe_allow_html=True)
 
 
 # ============================================
@@ -833,66 +1348,58 @@ def update_streak():
         progress['streak'] = 1
 
     progress['last_study_date'] = today
-    save_progress(progress)
+    save_progress_meta(progress)
     st.session_state.study_streak = progress['streak']
 
 
 # ============================================
 # HOME PAGE
 # ============================================
+HOME_HEADER_HTML = """
+<div class="main-header">
+    <div class="header-content">
+        <div class="header-greeting">Welcome back,</div>
+        <div class="header-title">Arsh! 👋</div>
+        <div class="header-subtitle">Ready to ace the MCAT? Let's study together! 💪</div>
+    </div>
+</div>
+"""
+
+STAT_CARD_TPL = string.Template(
+    '<div class="stat-card"><div class="stat-icon">${icon}</div>'
+    '<div class="stat-value">${value}</div><div class="stat-label">${label}</div></div>'
+)
+
+
+def stats_grid_html(stats) -> str:
+    """One-line stats grid markup from (icon, value, label) triples"""
+    cards = "".join(STAT_CARD_TPL.substitute(icon=icon, value=value, label=label)
+                    for icon, value, label in stats)
+    return f'<div class="stats-grid">{cards}</div>'
+
+
 def home_page():
     """Main dashboard with navigation"""
     # Check for welcome popup
-    if st.session_state.get('show_welcome_popup', False):
+    if st.session_state.show_welcome_popup:
         show_dedication_popup()
         return
 
-    data = load_flashcards()
     progress = load_progress()
 
-    # Header
-    st.markdown(f"""
-    <div class="main-header">
-        <div class="header-content">
-            <div class="header-greeting">Welcome back,</div>
-            <div class="header-title">Arsh! 👋</div>
-            <div class="header-subtitle">Ready to ace the MCAT? Let's study together! 💪</div>
-        </div>
-    </div>
-    """, unsafe_allow_html=True)
-
     # Stats Row
-    total_cards = len(data.get('flashcards', []))
-    total_studied = sum(s.get('total', 0) for s in progress.get('daily_scores', []))
-    avg_accuracy = 0
-    if progress.get('daily_scores'):
-        accuracies = [(s['correct']/s['total']*100) for s in progress['daily_scores'] if s['total'] > 0]
-        avg_accuracy = sum(accuracies) / len(accuracies) if accuracies else 0
-
-    st.markdown(f"""
-    <div class="stats-grid">
-        <div class="stat-card">
-            <div class="stat-icon">📚</div>
-            <div class="stat-value">{total_cards}</div>
-            <div class="stat-label">Total Flashcards</div>
-        </div>
-        <div class="stat-card">
-            <div class="stat-icon">✅</div>
-            <div class="stat-value">{total_studied}</div>
-            <div class="stat-label">Cards Studied</div>
-        </div>
-        <div class="stat-card">
-            <div class="stat-icon">🎯</div>
-            <div class="stat-value">{avg_accuracy:.0f}%</div>
-            <div class="stat-label">Avg. Accuracy</div>
-        </div>
-        <div class="stat-card">
-            <div class="stat-icon">🔥</div>
-            <div class="stat-value">{progress.get('streak', 0)}</div>
-            <div class="stat-label">Day Streak</div>
-        </div>
-    </div>
-    """, unsafe_allow_html=True)
+    total_cards = flashcard_count()
+    scores = daily_scores_array(daily_scores_key(progress.get('daily_scores', [])))
+    total_studied = int(scores['total'].sum())
+    avg_accuracy = mean_accuracy(scores)
+
+    # Header and stats go out as a single element
+    st.markdown(HOME_HEADER_HTML + stats_grid_html((
+        ("📚", total_cards, "Total Flashcards"),
+        ("✅", total_studied, "Cards Studied"),
+        ("🎯", f"{avg_accuracy:.0f}%", "Avg. Accuracy"),
+        ("🔥", progress.get('streak', 0), "Day Streak"),
+    )), unsafe_allow_html=True)
 
     # Navigation Cards
     st.markdown("### 📖 Study Modes")
@@ -937,7 +1444,10 @@ def home_page():
         if st.button("🔀 **Random Card**\n\nJump into a random flashcard",
                     use_container_width=True, key="nav_random"):
             st.session_state.current_page = 'flashcards'
-            st.session_state.current_card_index = random.randint(0, len(data.get('flashcards', [])) - 1)
+            # The pick is over the whole deck, so open it unfiltered
+            st.session_state.selected_category = 'all'
+            st.session_state.cat_select = 0
+            st.session_state.current_card_index = pick_random_card_index(total_cards)
             st.rerun()
 
     # Love Footer
@@ -965,7 +1475,7 @@ def home_page():
         if st.button("🔄 Reset All Progress", use_container_width=True):
             st.session_state.confirm_reset = True
 
-        if st.session_state.get('confirm_reset', False):
+        if st.session_state.confirm_reset:
             st.warning("Are you sure? This will delete ALL your progress!")
             col_a, col_b = st.columns(2)
             with col_a:
@@ -989,32 +1499,10 @@ def resources_page():
         st.session_state.current_page = 'home'
         st.rerun()
 
-    st.markdown("""
-    <div class="main-header" style="padding: 1.5rem 2rem;">
-        <div class="header-content">
-            <div class="header-title" style="font-size: 2rem;">📚 Study Resources</div>
-            <div class="header-subtitle">Curated MCAT prep materials to help you succeed</div>
-        </div>
-    </div>
-    """, unsafe_allow_html=True)
-
-    text_secondary = "#a0aec0"
-
-    for category, resources in MCAT_RESOURCES.items():
-        st.markdown(f"### {category}")
-
-        for resource in resources:
-            st.markdown(f"""
-            <div class="resource-card">
-                <a href="{resource['url']}" target="_blank" class="resource-link">
-                    🔗 {resource['name']}
-                </a>
-                <div style="color: {text_secondary}; font-size: 0.85rem; margin-top: 0.25rem;">
-                    {resource['desc']}
-                </div>
-            </div>
-            """, unsafe_allow_html=True)
+    render_page_header("📚 Study Resources", "Curated MCAT prep materials to help you succeed")
 
+    for category, cards_html in RESOURCES_HTML.items():
+        st.markdown(f"### {category}\n\n{cards_html}", unsafe_allow_html=True)
         st.markdown("")
 
     render_love_footer("Use these resources wisely! You're going to do amazing. 📖")
@@ -1023,6 +1511,79 @@ def resources_page():
 # ============================================
 # FLASHCARD STUDY PAGE
 # ============================================
+# Category id -> badge CSS class; unknown categories fall back to biology
+BADGE_CLASSES = {
+    'bio_biochem': 'badge-bio',
+    'chem': 'badge-chem',
+    'physics': 'badge-physics',
+    'psych_soc': 'badge-psych'
+}
+
+# Card markup is compiled once; card text is html-escaped before substitution
+PROGRESS_TPL = string.Template("""
+<div style="margin: ${margin};">
+    <div style="display: flex; justify-content: space-between;${gap}">
+        <span>${left}</span>
+        <span>${right}</span>
+    </div>
+    <div class="progress-container">
+        <div class="progress-bar" style="width: ${width}%"></div>
+    </div>
+</div>
+""")
+
+FLASHCARD_TPL = string.Template("""
+<div class="flashcard">
+    <div class="flashcard-category">
+        <span class="category-badge ${badge_class}">
+            ${icon} ${category}
+        </span>
+        ${high_yield}
+    </div>
+    <div class="flashcard-question">
+        ${question}
+    </div>
+</div>
+<br>
+""")
+
+ANSWER_TPL = string.Template("""
+<div class="flashcard-answer">
+    <div class="flashcard-answer-text">
+        <strong>✅ Answer:</strong><br><br>
+        ${answer}
+    </div>
+</div>
+<br>
+""")
+
+HIGH_YIELD_BADGE = '<span class="high-yield-badge">⭐ HIGH YIELD</span>'
+
+
+@st.cache_resource(show_spinner=False)
+def _render_card_html(source_mtime_ns: int) -> Dict[int, Tuple[str, str]]:
+    # cache_resource: the strings are immutable, so every session can share
+    # one dict instead of unpickling a copy of the whole deck's markup
+    data = _load_flashcards(source_mtime_ns)
+    categories = _load_categories_by_id(source_mtime_ns)
+    rendered = {}
+    for card in data.get('flashcards', []):
+        cat_info = categories.get(card.category)
+        front = FLASHCARD_TPL.substitute(
+            badge_class=BADGE_CLASSES.get(card.category, 'badge-bio'),
+            icon=cat_info['icon'] if cat_info else '📚',
+            category=html.escape(cat_info['name'] if cat_info else card.category),
+            high_yield=HIGH_YIELD_BADGE if card.high_yield else '',
+            question=html.escape(card.question)
+        )
+        rendered[card.id] = (front, ANSWER_TPL.substitute(answer=html.escape(card.answer)))
+    return rendered
+
+def load_card_html() -> Dict[int, Tuple[str, str]]:
+    """(front, answer) markup for every card id, rendered once per deck version"""
+    return _render_card_html(file_mtime_ns(FLASHCARDS_FILE))
+
+
 def flashcard_page():
     """Interactive flashcard study page"""
     data = load_flashcards()
@@ -1031,22 +1592,13 @@ def flashcard_page():
         st.session_state.current_page = 'home'
         st.rerun()
 
-    st.markdown("""
-    <div class="main-header" style="padding: 1.5rem 2rem;">
-        <div class="header-content">
-            <div class="header-title" style="font-size: 2rem;">🎴 Flashcard Study</div>
-            <div class="header-subtitle">Master MCAT concepts one card at a time</div>
-        </div>
-    </div>
-    """, unsafe_allow_html=True)
+    render_page_header("🎴 Flashcard Study", "Master MCAT concepts one card at a time")
 
-    categories = data.get('categories', [])
     flashcards = data.get('flashcards', [])
 
     col1, col2, col3 = st.columns([1, 2, 1])
     with col2:
-        category_options = ['all'] + [cat['id'] for cat in categories]
-        category_names = ['📚 All Categories'] + [f"{cat['icon']} {cat['name']}" for cat in categories]
+        category_options, category_names = load_category_choices()
 
         selected_idx = st.selectbox(
             "Select Category",
@@ -1059,136 +1611,137 @@ def flashcard_page():
     if st.session_state.selected_category == 'all':
         filtered_cards = flashcards
     else:
-        filtered_cards = [c for c in flashcards if c['category'] == st.session_state.selected_category]
+        positions = load_card_index()['by_category'].get(st.session_state.selected_category, ())
+        filtered_cards = [flashcards[i] for i in positions]
 
     if not filtered_cards:
         st.warning("No cards found in this category.")
         return
 
-    st.session_state.filtered_cards = filtered_cards
+    card_viewer(filtered_cards)
+
+    st.markdown("---")
+    st.markdown("### 📊 Session Stats")
+
+    render_session_metrics()
+
+    render_love_footer("Every card you master brings you closer to your dream. Keep going! 💪")
+
+
+@st.fragment
+def card_viewer(filtered_cards: List[Card]):
+    """Progress bar, current card and card navigation
 
+    Runs as a fragment so Previous/Next/Random only re-render the card
+    area, not the header, category picker and session stats.
+    """
     if st.session_state.current_card_index >= len(filtered_cards):
         st.session_state.current_card_index = 0
 
     current_card = filtered_cards[st.session_state.current_card_index]
-    cat_info = next((c for c in categories if c['id'] == current_card['category']), None)
 
     progress_pct = (st.session_state.current_card_index + 1) / len(filtered_cards)
-    st.markdown(f"""
-    <div style="margin: 1rem 0;">
-        <div style="display: flex; justify-content: space-between; margin-bottom: 0.5rem;">
-            <span>Card {st.session_state.current_card_index + 1} of {len(filtered_cards)}</span>
-            <span>{progress_pct*100:.0f}%</span>
-        </div>
-        <div class="progress-container">
-            <div class="progress-bar" style="width: {progress_pct*100}%"></div>
-        </div>
-    </div>
-    """, unsafe_allow_html=True)
-
-    badge_class = {
-        'bio_biochem': 'badge-bio',
-        'chem': 'badge-chem',
-        'physics': 'badge-physics',
-        'psych_soc': 'badge-psych'
-    }.get(current_card['category'], 'badge-bio')
+    st.markdown(PROGRESS_TPL.substitute(
+        margin="1rem 0",
+        gap=" margin-bottom: 0.5rem;",
+        left=f"Card {st.session_state.current_card_index + 1} of {len(filtered_cards)}",
+        right=f"{progress_pct*100:.0f}%",
+        width=progress_pct * 100
+    ), unsafe_allow_html=True)
 
     col1, col2, col3 = st.columns([1, 4, 1])
     with col2:
-        st.markdown(f"""
-        <div class="flashcard">
-            <div class="flashcard-category">
-                <span class="category-badge {badge_class}">
-                    {cat_info['icon'] if cat_info else '📚'} {cat_info['name'] if cat_info else current_card['category']}
-                </span>
-                {'<span class="high-yield-badge">⭐ HIGH YIELD</span>' if current_card.get('high_yield') else ''}
-            </div>
-            <div class="flashcard-question">
-                {current_card['question']}
-            </div>
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown(load_card_html()[current_card.id][0], unsafe_allow_html=True)
 
-        st.markdown("<br>", unsafe_allow_html=True)
-
-        if st.button("🔍 Show Answer" if not st.session_state.show_answer else "🙈 Hide Answer",
-                    use_container_width=True, type="primary"):
-            st.session_state.show_answer = not st.session_state.show_answer
-            st.rerun()
-
-        if st.session_state.show_answer:
-            st.markdown(f"""
-            <div class="flashcard-answer">
-                <div class="flashcard-answer-text">
-                    <strong>✅ Answer:</strong><br><br>
-                    {current_card['answer']}
-                </div>
-            </div>
-            """, unsafe_allow_html=True)
-
-            st.markdown("<br>", unsafe_allow_html=True)
-
-            col_a, col_b = st.columns(2)
-            with col_a:
-                if st.button("✅ I knew it!", use_container_width=True, type="primary"):
-                    st.session_state.score['correct'] += 1
-                    record_card_review(current_card['id'], True)
-                    next_card(filtered_cards)
-            with col_b:
-                if st.button("❌ Need review", use_container_width=True):
-                    st.session_state.score['incorrect'] += 1
-                    record_card_review(current_card['id'], False)
-                    next_card(filtered_cards)
+        answer_panel(current_card, filtered_cards)
 
     st.markdown("---")
     col1, col2, col3, col4 = st.columns(4)
+    last_index = len(filtered_cards) - 1
 
     with col1:
-        if st.button("⬅️ Previous", use_container_width=True,
-                    disabled=st.session_state.current_card_index == 0):
-            st.session_state.current_card_index -= 1
-            st.session_state.show_answer = False
-            st.rerun()
+        st.button("⬅️ Previous", use_container_width=True,
+                  disabled=st.session_state.current_card_index == 0,
+                  on_click=go_to_card, args=(st.session_state.current_card_index - 1,))
 
     with col2:
-        if st.button("🔀 Random", use_container_width=True):
-            st.session_state.current_card_index = random.randint(0, len(filtered_cards) - 1)
-            st.session_state.show_answer = False
-            st.rerun()
+        st.button("🔀 Random", use_container_width=True,
+                  on_click=go_to_random_card, args=(len(filtered_cards),))
 
     with col3:
-        bookmark_label = "🔖 Bookmarked" if current_card['id'] in st.session_state.bookmarked_cards else "📌 Bookmark"
-        if st.button(bookmark_label, use_container_width=True):
-            if current_card['id'] in st.session_state.bookmarked_cards:
-                st.session_state.bookmarked_cards.remove(current_card['id'])
-            else:
-                st.session_state.bookmarked_cards.add(current_card['id'])
-            st.rerun()
+        bookmark_button(current_card.id)
 
     with col4:
-        if st.button("Next ➡️", use_container_width=True,
-                    disabled=st.session_state.current_card_index >= len(filtered_cards) - 1):
-            st.session_state.current_card_index += 1
-            st.session_state.show_answer = False
-            st.rerun()
+        st.button("Next ➡️", use_container_width=True,
+                  disabled=st.session_state.current_card_index >= last_index,
+                  on_click=go_to_card, args=(st.session_state.current_card_index + 1,))
 
-    st.markdown("---")
-    st.markdown("### 📊 Session Stats")
 
-    col1, col2, col3, col4 = st.columns(4)
-    total = st.session_state.score['correct'] + st.session_state.score['incorrect']
-    accuracy = (st.session_state.score['correct'] / total * 100) if total > 0 else 0
+def go_to_card(index: int):
+    """Jump to a card in the current deck (button callback)"""
+    st.session_state.current_card_index = index
+    st.session_state.show_answer = False
 
-    with col1:
-        st.metric("✅ Correct", st.session_state.score['correct'])
-    with col2:
-        st.metric("❌ To Review", st.session_state.score['incorrect'])
-    with col3:
-        st.metric("📚 Total", total)
-    with col4:
-        st.metric("🎯 Accuracy", f"{accuracy:.0f}%")
 
-    render_love_footer("Every card you master brings you closer to your dream. Keep going! 💪")
+def go_to_random_card(deck_size: int):
+    """Jump to a random card in the current deck (button callback)"""
+    go_to_card(pick_random_card_index(deck_size))
+
+
+def pick_random_card_index(deck_size: int) -> int:
+    """Random card position that cycles through the whole deck before repeating
+
+    A shuffled order is kept per category and refilled once it runs out,
+    so switching filters picks up each category's cycle where it left off.
+    """
+    if deck_size <= 0:
+        return 0
+    orders = st.session_state.random_card_order
+    key = (st.session_state.selected_category, deck_size)
+    if not orders.get(key):
+        orders[key] = random.sample(range(deck_size), deck_size)
+    return orders[key].pop()
+    return index
+
+
+@st.fragment
+def answer_panel(current_card: Card, filtered_cards: List[Card]):
+    """Show/Hide Answer toggle and rating buttons
+
+    Runs as a fragment so revealing the answer only re-renders this panel;
+    rating a card still reruns the whole page to move to the next card.
+    """
+    st.button("🔍 Show Answer" if not st.session_state.show_answer else "🙈 Hide Answer",
+              use_container_width=True, type="primary", on_click=toggle_show_answer)
+
+    if st.session_state.show_answer:
+        st.markdown(load_card_html()[current_card.id][1], unsafe_allow_html=True)
+
+        col_a, col_b = st.columns(2)
+        with col_a:
+            if st.button("✅ I knew it!", use_container_width=True, type="primary"):
+                record_score(True)
+                record_card_review(current_card.id, quality=4)
+                next_card(filtered_cards)
+        with col_b:
+            if st.button("❌ Need review", use_container_width=True):
+                record_score(False)
+                record_card_review(current_card.id, quality=1)
+                next_card(filtered_cards)
+
+
+def toggle_show_answer():
+    """Flip the answer visibility (button callback)"""
+    st.session_state.show_answer = not st.session_state.show_answer
+
+
+@st.fragment
+def bookmark_button(card_id: int):
+    """Bookmark toggle that only re-renders itself"""
+    is_bookmarked = card_id in st.session_state.bookmarked_cards
+    bookmark_label = "🔖 Bookmarked" if is_bookmarked else "📌 Bookmark"
+    st.button(bookmark_label, use_container_width=True,
+              on_click=toggle_bookmark, args=(card_id,))
 
 
 def next_card(filtered_cards):
@@ -1201,37 +1754,82 @@ def next_card(filtered_cards):
     st.rerun()
 
 
-def record_card_review(card_id: int, correct: bool):
-    """Record card review for SRS"""
-    srs_data = load_srs_data()
-    card_key = str(card_id)
+def toggle_bookmark(card_id: int):
+    """Add or remove a card from the bookmarked snapshot"""
+    st.session_state.bookmarked_cards ^= frozenset((card_id,))
 
-    if card_key not in srs_data['cards']:
-        srs_data['cards'][card_key] = {
-            'reviews': 0,
-            'correct': 0,
-            'ease_factor': 2.5,
-            'interval': 1,
-            'last_review': None
-        }
 
-    srs_data['cards'][card_key]['reviews'] += 1
-    if correct:
-        srs_data['cards'][card_key]['correct'] += 1
-        srs_data['cards'][card_key]['interval'] = min(
-            srs_data['cards'][card_key]['interval'] * srs_data['cards'][card_key]['ease_factor'],
-            365
-        )
-    else:
-        srs_data['cards'][card_key]['interval'] = 1
+def get_srs_data() -> Dict:
+    """Session copy of the SRS data, loaded from disk on first use"""
+    if st.session_state.srs_data is None:
+        st.session_state.srs_data = load_srs_data()
+    return st.session_state.srs_data
+
+
+def flush_srs():
+    """Write the cards reviewed since the last flush to the database"""
+    if st.session_state.srs_pending_writes:
+        cards = st.session_state.srs_data['cards']
+        save_srs_cards({card_id: cards[card_id] for card_id in st.session_state.srs_dirty_cards})
+        st.session_state.srs_pending_writes = 0
+        st.session_state.srs_dirty_cards = set()
+
+
+def record_card_review(card_id: int, quality: int):
+    """Record card review for SRS (kept in memory until the next flush)
+
+    Scheduling follows SM-2: quality 0-2 resets the card, 3-5 grows the
+    interval by the card's ease factor, which itself adapts to the rating.
+    The flashcard buttons rate "I knew it!" as 4 and "Need review" as 1,
+    matching SpacedRepetitionSystem.record_simple_review.
+    """
+    srs_data = get_srs_data()
+    card = srs_data['cards'].setdefault(str(card_id), dict(SRS_CARD_DEFAULTS))
+    card.setdefault('repetitions', 0)  # Records saved before SM-2 scheduling
 
-    srs_data['cards'][card_key]['last_review'] = datetime.now().isoformat()
-    save_srs_data(srs_data)
+    interval, ease_factor, repetitions = sm2_schedule(
+        card['ease_factor'], card['interval'], card['repetitions'], quality
+    )
+
+    card['reviews'] += 1
+    if quality >= 3:
+        card['correct'] += 1
+    card['interval'] = min(interval, 365)
+    card['ease_factor'] = ease_factor
+    card['repetitions'] = repetitions
+    card['last_review'] = datetime.now().isoformat()
+    st.session_state.srs_pending_writes += 1
+    st.session_state.srs_dirty_cards.add(str(card_id))
 
 
 # ============================================
 # QUIZ MODE PAGE
 # ============================================
+QUIZ_QUESTION_TPL = string.Template("""
+<div class="flashcard" style="min-height: 200px;">
+    <div style="position: absolute; top: 1rem; right: 1rem;">
+        <span class="category-badge badge-chem">${difficulty}</span>
+    </div>
+    <div class="flashcard-question" style="font-size: 1.3rem;">
+        ${question}
+    </div>
+</div>
+<br>
+""")
+
+# (minimum accuracy %, emoji) for the quiz result, best first
+QUIZ_RESULT_EMOJIS = ((70, '🎉'), (50, '📚'))
+QUIZ_RESULT_FALLBACK_EMOJI = '💪'
+
+
+def quiz_result_emoji(pct: float) -> str:
+    """Emoji shown on the quiz result screen for a given accuracy"""
+    for threshold, emoji in QUIZ_RESULT_EMOJIS:
+        if pct >= threshold:
+            return emoji
+    return QUIZ_RESULT_FALLBACK_EMOJI
+
+
 def quiz_page():
     """Quiz mode with enhanced API questions"""
 
@@ -1240,23 +1838,19 @@ def quiz_page():
         st.session_state.quiz_active = False
         st.rerun()
 
-    st.markdown("""
-    <div class="main-header" style="padding: 1.5rem 2rem;">
-        <div class="header-content">
-            <div class="header-title" style="font-size: 2rem;">🧪 Quiz Mode</div>
-            <div class="header-subtitle">Test your knowledge with science questions</div>
-        </div>
-    </div>
-    """, unsafe_allow_html=True)
+    render_page_header("🧪 Quiz Mode", "Test your knowledge with science questions")
 
     if not st.session_state.quiz_active:
         st.markdown("### ⚙️ Quiz Settings")
 
         col1, col2 = st.columns(2)
         with col1:
-            num_questions = st.slider("Number of Questions", 5, 50, 10)
+            num_questions = st.slider("Number of Questions", 5, QUIZ_MAX_QUESTIONS, QUIZ_DEFAULT_QUESTIONS)
         with col2:
             st.info("Questions sourced from multiple trivia APIs")
+            st.button("🔄 Refresh Questions", use_container_width=True,
+                      help="Fetch a new batch instead of today's cached questions",
+                      on_click=fetch_question_pool.clear)
 
         st.markdown("---")
 
@@ -1277,53 +1871,7 @@ def quiz_page():
         current_idx = st.session_state.quiz_current
 
         if current_idx < len(questions):
-            q = questions[current_idx]
-
-            progress = (current_idx + 1) / len(questions)
-            st.markdown(f"""
-            <div style="margin-bottom: 1rem;">
-                <div style="display: flex; justify-content: space-between;">
-                    <span>Question {current_idx + 1} of {len(questions)}</span>
-                    <span>Score: {st.session_state.quiz_score}/{current_idx}</span>
-                </div>
-                <div class="progress-container">
-                    <div class="progress-bar" style="width: {progress*100}%"></div>
-                </div>
-            </div>
-            """, unsafe_allow_html=True)
-
-            st.markdown(f"""
-            <div class="flashcard" style="min-height: 200px;">
-                <div style="position: absolute; top: 1rem; right: 1rem;">
-                    <span class="category-badge badge-chem">{q.get('difficulty', 'medium').title()}</span>
-                </div>
-                <div class="flashcard-question" style="font-size: 1.3rem;">
-                    {q['question']}
-                </div>
-            </div>
-            """, unsafe_allow_html=True)
-
-            st.markdown("<br>", unsafe_allow_html=True)
-
-            for i, option in enumerate(q['options']):
-                if st.button(f"{chr(65+i)}. {option}", use_container_width=True, key=f"opt_{i}"):
-                    correct = option == q['correct_answer']
-                    st.session_state.quiz_answers.append({
-                        'question': q['question'],
-                        'selected': option,
-                        'correct': q['correct_answer'],
-                        'is_correct': correct
-                    })
-                    if correct:
-                        st.session_state.quiz_score += 1
-                        st.success("✅ Correct!")
-                    else:
-                        st.error(f"❌ Wrong! The answer was: {q['correct_answer']}")
-
-                    st.session_state.quiz_current += 1
-                    import time
-                    time.sleep(1)
-                    st.rerun()
+            quiz_question_panel()
         else:
             score = st.session_state.quiz_score
             total = len(questions)
@@ -1331,7 +1879,7 @@ def quiz_page():
 
             st.markdown(f"""
             <div style="text-align: center; padding: 3rem;">
-                <div style="font-size: 5rem;">{'🎉' if pct >= 70 else '📚' if pct >= 50 else '💪'}</div>
+                <div style="font-size: 5rem;">{quiz_result_emoji(pct)}</div>
                 <h1 style="margin: 1rem 0;">Quiz Complete!</h1>
                 <div class="stat-value" style="font-size: 4rem;">{score}/{total}</div>
                 <p style="font-size: 1.5rem; opacity: 0.8;">{pct:.0f}% Accuracy</p>
@@ -1354,9 +1902,68 @@ def quiz_page():
             render_love_footer("You're learning and growing with every question. So proud of you! 🌟")
 
 
+@st.fragment
+def quiz_question_panel():
+    """Current quiz question and its answer buttons
+
+    Runs as a fragment so answering only redraws the question area; the
+    whole page reruns once after the last answer to show the results.
+    """
+    questions = st.session_state.quiz_questions
+    current_idx = st.session_state.quiz_current
+    if current_idx >= len(questions):
+        st.rerun()  # Last question answered, redraw the page with the results
+    q = questions[current_idx]
+
+    # Progress bar and question go out as a single element
+    progress = (current_idx + 1) / len(questions)
+    st.markdown(PROGRESS_TPL.substitute(
+        margin="0 0 1rem 0",
+        gap="",
+        left=f"Question {current_idx + 1} of {len(questions)}",
+        right=f"Score: {st.session_state.quiz_score}/{current_idx}",
+        width=progress * 100
+    ) + QUIZ_QUESTION_TPL.substitute(
+        difficulty=html.escape(q.difficulty.title()),
+        question=html.escape(q.question)
+    ), unsafe_allow_html=True)
+
+    for i, option in enumerate(q.options):
+        st.button(f"{chr(65+i)}. {option}", use_container_width=True, key=f"opt_{i}",
+                  on_click=answer_quiz_question, args=(q, option))
+
+
+def answer_quiz_question(q: MCQ, option: str):
+    """Record an answer and move to the next question (button callback)"""
+    correct = option == q.correct_answer
+    st.session_state.quiz_answers.append({
+        'question': q.question,
+        'selected': option,
+        'correct': q.correct_answer,
+        'is_correct': correct
+    })
+    # Toasts survive the rerun, so feedback no longer needs a blocking pause
+    if correct:
+        st.session_state.quiz_score += 1
+        st.toast("✅ Correct!")
+    else:
+        st.toast(f"❌ Wrong! The answer was: {q.correct_answer}")
+
+    st.session_state.quiz_current += 1
+
+
 # ============================================
 # TIMED PRACTICE PAGE
 # ============================================
+TIMED_CARD_TPL = string.Template("""
+<div class="flashcard" style="min-height: 250px;">
+    <div class="flashcard-question">
+        ${question}
+    </div>
+</div>
+""")
+
+
 def timed_page():
     """Timed practice mode"""
     data = load_flashcards()
@@ -1366,14 +1973,7 @@ def timed_page():
         st.session_state.timer_active = False
         st.rerun()
 
-    st.markdown("""
-    <div class="main-header" style="padding: 1.5rem 2rem;">
-        <div class="header-content">
-            <div class="header-title" style="font-size: 2rem;">⏱️ Timed Practice</div>
-            <div class="header-subtitle">Practice under MCAT-style time pressure</div>
-        </div>
-    </div>
-    """, unsafe_allow_html=True)
+    render_page_header("⏱️ Timed Practice", "Practice under MCAT-style time pressure")
 
     if not st.session_state.timer_active:
         st.markdown("### ⚙️ Timer Settings")
@@ -1388,102 +1988,55 @@ def timed_page():
         st.info(f"📝 You'll have {duration} seconds to review each of {num_cards} cards.")
 
         if st.button("🚀 Start Timed Session", use_container_width=True, type="primary"):
-            flashcards = data.get('flashcards', [])
-            st.session_state.filtered_cards = random.sample(flashcards, min(num_cards, len(flashcards)))
+            deck_size = len(data.get('flashcards', []))
+            st.session_state.timed_card_ids = random.sample(range(deck_size), min(num_cards, deck_size))
             st.session_state.current_card_index = 0
             st.session_state.timer_active = True
             st.session_state.timer_start = datetime.now()
             st.session_state.score = {'correct': 0, 'incorrect': 0}
             st.rerun()
     else:
-        filtered_cards = st.session_state.filtered_cards
-
-        if st.session_state.current_card_index < len(filtered_cards):
-            current_card = filtered_cards[st.session_state.current_card_index]
-
-            elapsed = (datetime.now() - st.session_state.timer_start).total_seconds()
-            remaining = max(0, st.session_state.timer_duration - elapsed)
+        flashcards = data.get('flashcards', [])
+        card_ids = st.session_state.timed_card_ids
 
-            if remaining <= 0:
-                st.session_state.score['incorrect'] += 1
-                st.session_state.current_card_index += 1
-                st.session_state.timer_start = datetime.now()
-                st.session_state.show_answer = False
-                st.rerun()
-
-            timer_class = ""
-            if remaining < 10:
-                timer_class = "timer-danger"
-            elif remaining < 20:
-                timer_class = "timer-warning"
+        if st.session_state.current_card_index < len(card_ids):
+            current_card = flashcards[card_ids[st.session_state.current_card_index]]
 
-            col1, col2, col3 = st.columns([1, 2, 1])
-            with col2:
-                st.markdown(f"""
-                <div class="timer-display {timer_class}">
-                    {int(remaining)}s
-                </div>
-                """, unsafe_allow_html=True)
+            timed_countdown()
 
-            st.markdown(f"**Card {st.session_state.current_card_index + 1} of {len(filtered_cards)}**")
-            st.progress((st.session_state.current_card_index + 1) / len(filtered_cards))
+            st.markdown(f"**Card {st.session_state.current_card_index + 1} of {len(card_ids)}**")
+            st.progress((st.session_state.current_card_index + 1) / len(card_ids))
 
-            st.markdown(f"""
-            <div class="flashcard" style="min-height: 250px;">
-                <div class="flashcard-question">
-                    {current_card['question']}
-                </div>
-            </div>
-            """, unsafe_allow_html=True)
+            st.markdown(TIMED_CARD_TPL.substitute(question=html.escape(current_card.question)),
+                        unsafe_allow_html=True)
 
             col_a, col_b = st.columns(2)
             with col_a:
                 if st.button("✅ I know this!", use_container_width=True, type="primary"):
-                    st.session_state.score['correct'] += 1
-                    st.session_state.current_card_index += 1
-                    st.session_state.timer_start = datetime.now()
-                    st.session_state.show_answer = False
+                    record_score(True)
+                    next_timed_card()
                     st.rerun()
             with col_b:
                 if st.button("❌ Skip / Don't know", use_container_width=True):
-                    st.session_state.score['incorrect'] += 1
-                    st.session_state.current_card_index += 1
-                    st.session_state.timer_start = datetime.now()
-                    st.session_state.show_answer = False
+                    record_score(False)
+                    next_timed_card()
                     st.rerun()
 
             if st.button("👁️ Peek at Answer", use_container_width=True):
-                st.info(f"**Answer:** {current_card['answer']}")
-
-            import time
-            time.sleep(1)
-            st.rerun()
+                st.info(f"**Answer:** {current_card.answer}")
         else:
             st.session_state.timer_active = False
-            total = st.session_state.score['correct'] + st.session_state.score['incorrect']
-            accuracy = (st.session_state.score['correct'] / total * 100) if total > 0 else 0
+            correct, incorrect, _, accuracy = session_score()
 
             st.markdown(f"""
             <div style="text-align: center; padding: 3rem;">
                 <div style="font-size: 5rem;">⏱️</div>
                 <h1>Timed Session Complete!</h1>
-                <div class="stats-grid">
-                    <div class="stat-card">
-                        <div class="stat-icon">✅</div>
-                        <div class="stat-value">{st.session_state.score['correct']}</div>
-                        <div class="stat-label">Correct</div>
-                    </div>
-                    <div class="stat-card">
-                        <div class="stat-icon">❌</div>
-                        <div class="stat-value">{st.session_state.score['incorrect']}</div>
-                        <div class="stat-label">To Review</div>
-                    </div>
-                    <div class="stat-card">
-                        <div class="stat-icon">🎯</div>
-                        <div class="stat-value">{accuracy:.0f}%</div>
-                        <div class="stat-label">Accuracy</div>
-                    </div>
-                </div>
+                {stats_grid_html((
+                    ("✅", correct, "Correct"),
+                    ("❌", incorrect, "To Review"),
+                    ("🎯", f"{accuracy:.0f}%", "Accuracy"),
+                ))}
             </div>
             """, unsafe_allow_html=True)
 
@@ -1494,9 +2047,155 @@ def timed_page():
             render_love_footer("Practice makes perfect. You handled that pressure like a champ! ⏱️")
 
 
+@st.fragment(run_every=1)
+def timed_countdown():
+    """Countdown for the current timed card, refreshed every second
+
+    Only this fragment re-runs on each tick. When time runs out the card
+    counts as missed and the whole page moves on to the next card.
+    """
+    elapsed = (datetime.now() - st.session_state.timer_start).total_seconds()
+    remaining = max(0, st.session_state.timer_duration - elapsed)
+
+    if remaining <= 0:
+        record_score(False)
+        next_timed_card()
+        st.rerun()
+
+    timer_class = ""
+    if remaining < 10:
+        timer_class = "timer-danger"
+    elif remaining < 20:
+        timer_class = "timer-warning"
+
+    col1, col2, col3 = st.columns([1, 2, 1])
+    with col2:
+        st.markdown(f"""
+        <div class="timer-display {timer_class}">
+            {int(remaining)}s
+        </div>
+        """, unsafe_allow_html=True)
+
+
+def next_timed_card():
+    """Advance the timed session and restart the countdown"""
+    st.session_state.current_card_index += 1
+    st.session_state.timer_start = datetime.now()
+    st.session_state.show_answer = False
+
+
 # ============================================
 # PROGRESS PAGE
 # ============================================
+DAILY_SCORES_DTYPE = np.dtype([
+    ('date', 'U10'), ('correct', 'i4'), ('incorrect', 'i4'), ('total', 'i4')
+])
+
+
+def daily_scores_key(daily_scores: List[Dict]) -> tuple:
+    """Hashable snapshot of the study history, used as a chart cache key"""
+    return tuple((s['date'], s['correct'], s['incorrect'], s['total']) for s in daily_scores)
+
+
+def daily_scores_array(history: tuple) -> np.ndarray:
+    """Study history as a structured array, for vectorized summary metrics"""
+    return np.array(list(history), dtype=DAILY_SCORES_DTYPE)
+
+
+def mean_accuracy(scores: np.ndarray) -> float:
+    """Average daily accuracy %, skipping days with nothing answered"""
+    answered = scores[scores['total'] > 0]
+    if not answered.size:
+        return 0.0
+    return float((answered['correct'] / answered['total']).mean() * 100)
+
+
+# Only the progress page needs these; imported lazily to keep startup fast
+CHART_MODULES = ('pandas', 'plotly.express', 'plotly.graph_objects')
+
+
+def preload_progress_page():
+    """Warm the progress page in the background after login
+
+    Imports the charting libraries (Python keeps them for the whole
+    process), then fills the _load_progress and build_progress_charts
+    caches, so the first visit to the progress page renders warm.
+    """
+    def warm():
+        for name in CHART_MODULES:
+            importlib.import_module(name)
+        history = daily_scores_key(_load_progress()['daily_scores'])
+        if history:
+            build_progress_charts(history)
+
+    thread = threading.Thread(target=warm, daemon=True)
+    add_script_run_ctx(thread)
+    thread.start()
+
+
+CHART_MAX_POINTS = 200  # Longer histories are charted as weekly totals
+
+
+@st.cache_data(show_spinner=False)
+def build_progress_charts(history: tuple) -> tuple:
+    """Build the study history figures once per distinct history
+
+    Returns the two figures as plotly dicts so a cache hit skips rebuilding
+    the traces and running plotly express.
+    """
+    import pandas as pd
+    import plotly.express as px
+    import plotly.graph_objects as go
+
+    df = pd.DataFrame(history, columns=['date', 'correct', 'incorrect', 'total'])
+    df['date'] = pd.to_datetime(df['date'])
+    period = 'Daily'
+    if len(df) > CHART_MAX_POINTS:
+        # Weekly totals keep long histories readable and the figure payload bounded
+        df = df.resample('W', on='date')[['correct', 'incorrect', 'total']].sum().reset_index()
+        period = 'Weekly'
+    # Days (or empty weeks) with nothing answered have no accuracy, same as mean_accuracy()
+    df = df[df['total'] > 0]
+    df['accuracy'] = df['correct'] / df['total'] * 100
+
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=df['date'], y=df['total'],
+        mode='lines+markers', name='Total Cards',
+        line=dict(color='#8b5cf6', width=3),
+        marker=dict(size=8)
+    ))
+    fig.add_trace(go.Scatter(
+        x=df['date'], y=df['correct'],
+        mode='lines+markers', name='Correct',
+        line=dict(color='#10b981', width=3),
+        marker=dict(size=8)
+    ))
+    fig.update_layout(
+        title=f'{period} Study Progress',
+        xaxis_title='Date',
+        yaxis_title='Cards',
+        template='plotly_dark',
+        hovermode='x unified'
+    )
+
+    fig2 = px.bar(df, x='date', y='accuracy',
+                  title=f'{period} Accuracy',
+                  color='accuracy',
+                  color_continuous_scale='RdYlGn')
+    fig2.update_layout(template='plotly_dark')
+
+    return fig.to_dict(), fig2.to_dict()
+
+
+CATEGORY_CARD_TPL = string.Template(
+    '<div class="stat-card"><div class="stat-icon">${icon}</div>'
+    '<div class="stat-value" style="font-size: 1.8rem;">${total}</div>'
+    '<div class="stat-label">${name}</div>'
+    '<div style="color: #ef4444; font-size: 0.8rem;">⭐ ${high_yield} high yield</div></div>'
+)
+
+
 def progress_page():
     """Progress and statistics page"""
     data = load_flashcards()
@@ -1506,81 +2205,34 @@ def progress_page():
         st.session_state.current_page = 'home'
         st.rerun()
 
-    st.markdown("""
-    <div class="main-header" style="padding: 1.5rem 2rem;">
-        <div class="header-content">
-            <div class="header-title" style="font-size: 2rem;">📊 Your Progress</div>
-            <div class="header-subtitle">Track your MCAT preparation journey</div>
-        </div>
-    </div>
-    """, unsafe_allow_html=True)
+    render_page_header("📊 Your Progress", "Track your MCAT preparation journey")
 
     st.markdown("### 📅 Current Session")
 
-    total_today = st.session_state.score['correct'] + st.session_state.score['incorrect']
-    accuracy_today = (st.session_state.score['correct'] / total_today * 100) if total_today > 0 else 0
-
-    col1, col2, col3, col4 = st.columns(4)
-    with col1:
-        st.metric("✅ Correct", st.session_state.score['correct'])
-    with col2:
-        st.metric("❌ To Review", st.session_state.score['incorrect'])
-    with col3:
-        st.metric("📚 Total", total_today)
-    with col4:
-        st.metric("🎯 Accuracy", f"{accuracy_today:.0f}%")
+    render_session_metrics()
 
     st.markdown("---")
 
     st.markdown("### 📈 Study History")
 
     if progress.get('daily_scores'):
-        import pandas as pd
-        import plotly.express as px
-        import plotly.graph_objects as go
-
-        df = pd.DataFrame(progress['daily_scores'])
-        df['date'] = pd.to_datetime(df['date'])
-        df['accuracy'] = df['correct'] / df['total'] * 100
-
-        fig = go.Figure()
-        fig.add_trace(go.Scatter(
-            x=df['date'], y=df['total'],
-            mode='lines+markers', name='Total Cards',
-            line=dict(color='#8b5cf6', width=3),
-            marker=dict(size=8)
-        ))
-        fig.add_trace(go.Scatter(
-            x=df['date'], y=df['correct'],
-            mode='lines+markers', name='Correct',
-            line=dict(color='#10b981', width=3),
-            marker=dict(size=8)
-        ))
-        fig.update_layout(
-            title='Daily Study Progress',
-            xaxis_title='Date',
-            yaxis_title='Cards',
-            template='plotly_dark',
-            hovermode='x unified'
-        )
-        st.plotly_chart(fig, use_container_width=True)
+        history = daily_scores_key(progress['daily_scores'])
+        # Summary metrics come straight from a structured array; pandas is only needed for the charts
+        scores = daily_scores_array(history)
 
-        fig2 = px.bar(df, x='date', y='accuracy',
-                     title='Daily Accuracy',
-                     color='accuracy',
-                     color_continuous_scale='RdYlGn')
-        fig2.update_layout(template='plotly_dark')
-        st.plotly_chart(fig2, use_container_width=True)
+        progress_fig, accuracy_fig = build_progress_charts(history)
+        st.plotly_chart(progress_fig, use_container_width=True)
+        st.plotly_chart(accuracy_fig, use_container_width=True)
 
         st.markdown("### 📊 Overall Statistics")
         col1, col2, col3, col4 = st.columns(4)
 
         with col1:
-            st.metric("Total Cards Studied", int(df['total'].sum()))
+            st.metric("Total Cards Studied", int(scores['total'].sum()))
         with col2:
-            st.metric("Average Accuracy", f"{df['accuracy'].mean():.1f}%")
+            st.metric("Average Accuracy", f"{mean_accuracy(scores):.1f}%")
         with col3:
-            st.metric("Study Sessions", len(df))
+            st.metric("Study Sessions", len(scores))
         with col4:
             st.metric("Current Streak", f"{progress.get('streak', 0)} days 🔥")
     else:
@@ -1590,22 +2242,15 @@ def progress_page():
     st.markdown("### 📚 Category Overview")
 
     categories = data.get('categories', [])
-    flashcards = data.get('flashcards', [])
+    card_index = load_card_index()
 
-    cols = st.columns(4)
-    for i, cat in enumerate(categories):
-        cat_cards = len([c for c in flashcards if c['category'] == cat['id']])
-        high_yield = len([c for c in flashcards if c['category'] == cat['id'] and c.get('high_yield')])
-
-        with cols[i]:
-            st.markdown(f"""
-            <div class="stat-card">
-                <div class="stat-icon">{cat['icon']}</div>
-                <div class="stat-value" style="font-size: 1.8rem;">{cat_cards}</div>
-                <div class="stat-label">{cat['name']}</div>
-                <div style="color: #ef4444; font-size: 0.8rem;">⭐ {high_yield} high yield</div>
-            </div>
-            """, unsafe_allow_html=True)
+    overview = []
+    for cat in categories:
+        cat_cards, high_yield = card_index['category_counts'].get(cat['id'], (0, 0))
+        overview.append(CATEGORY_CARD_TPL.substitute(
+            icon=cat['icon'], total=cat_cards, name=html.escape(cat['name']), high_yield=high_yield
+        ))
+    st.markdown(f'<div class="stats-grid">{"".join(overview)}</div>', unsafe_allow_html=True)
 
     # Reset Progress Section
     st.markdown("---")
@@ -1617,7 +2262,7 @@ def progress_page():
         if st.button("🔄 Reset All Progress", use_container_width=True, key="reset_progress_btn"):
             st.session_state.confirm_reset_progress = True
 
-    if st.session_state.get('confirm_reset_progress', False):
+    if st.session_state.confirm_reset_progress:
         st.error("⚠️ Are you sure? This will delete ALL your progress, streaks, and bookmarks!")
         col_a, col_b, col_c = st.columns([1, 1, 1])
         with col_a:
@@ -1637,33 +2282,85 @@ def progress_page():
 # ============================================
 # SAVE SESSION PROGRESS
 # ============================================
-def save_session_progress():
-    """Save current session progress"""
-    if st.session_state.score['correct'] + st.session_state.score['incorrect'] > 0:
-        progress = load_progress()
-        today = date.today().isoformat()
-
-        daily_entry = {
-            'date': today,
-            'correct': st.session_state.score['correct'],
-            'incorrect': st.session_state.score['incorrect'],
-            'total': st.session_state.score['correct'] + st.session_state.score['incorrect']
-        }
-
-        existing = next((i for i, s in enumerate(progress['daily_scores']) if s['date'] == today), None)
-        if existing is not None:
-            progress['daily_scores'][existing]['correct'] += daily_entry['correct']
-            progress['daily_scores'][existing]['incorrect'] += daily_entry['incorrect']
-            progress['daily_scores'][existing]['total'] += daily_entry['total']
-        else:
-            progress['daily_scores'].append(daily_entry)
+PROGRESS_FLUSH_SECONDS = 5
+SRS_FLUSH_REVIEWS = 8  # Flush early once this many reviews are buffered
+
+
+def record_score(correct: bool):
+    """Count a rating in the session score and queue it for the next flush"""
+    key = 'correct' if correct else 'incorrect'
+    st.session_state.score[key] += 1
+    queue_progress_update(key)
 
-        save_progress(progress)
+
+def session_score() -> Tuple[int, int, int, float]:
+    """(correct, incorrect, total, accuracy %) for the current session"""
+    correct = st.session_state.score['correct']
+    incorrect = st.session_state.score['incorrect']
+    total = correct + incorrect
+    return correct, incorrect, total, (correct / total * 100) if total > 0 else 0
+
+
+def render_session_metrics():
+    """Four-column session score metrics shared by the flashcard and progress pages"""
+    correct, incorrect, total, accuracy = session_score()
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("✅ Correct", correct)
+    with col2:
+        st.metric("❌ To Review", incorrect)
+    with col3:
+        st.metric("📚 Total", total)
+    with col4:
+        st.metric("🎯 Accuracy", f"{accuracy:.0f}%")
+
+
+def queue_progress_update(key: str, amount: int = 1):
+    """Buffer a daily-score delta until maybe_flush_progress writes it"""
+    st.session_state._pending_progress[key] += amount
+
+
+def maybe_flush_progress(force: bool = False):
+    """Write buffered daily-score deltas and SRS updates if enough time has passed
+
+    Flushing is also forced whenever the user lands on the home page or
+    SRS_FLUSH_REVIEWS reviews are buffered, so progress is never more than
+    one page change, a few seconds, or a handful of cards behind.
+    """
+    pending = st.session_state._pending_progress
+    if pending['correct'] + pending['incorrect'] == 0 and not st.session_state.srs_pending_writes:
+        return
+    if not force and st.session_state.srs_pending_writes < SRS_FLUSH_REVIEWS:
+        elapsed = time.time() - st.session_state._last_progress_flush
+        if elapsed < PROGRESS_FLUSH_SECONDS and st.session_state.current_page != 'home':
+            return
+    save_session_progress()
+
+
+def save_session_progress():
+    """Save buffered session progress to today's entry"""
+    pending = st.session_state._pending_progress
+    if pending['correct'] + pending['incorrect'] > 0:
+        add_daily_score(date.today().isoformat(), pending['correct'], pending['incorrect'])
+        st.session_state._pending_progress = {'correct': 0, 'incorrect': 0}
+    flush_srs()
+    st.session_state._last_progress_flush = time.time()
 
 
 # ============================================
 # MAIN APPLICATION
 # ============================================
+# current_page value -> page renderer; unknown pages fall back to home
+PAGES = {
+    'home': home_page,
+    'flashcards': flashcard_page,
+    'quiz': quiz_page,
+    'timed': timed_page,
+    'progress': progress_page,
+    'resources': resources_page,
+}
+
+
 def main():
     """Main application entry point"""
     load_css()
@@ -1672,22 +2369,8 @@ def main():
         login_page()
         return
 
-    page = st.session_state.current_page
-
-    if page == 'home':
-        home_page()
-    elif page == 'flashcards':
-        flashcard_page()
-    elif page == 'quiz':
-        quiz_page()
-    elif page == 'timed':
-        timed_page()
-    elif page == 'progress':
-        progress_page()
-    elif page == 'resources':
-        resources_page()
-    else:
-        home_page()
+    maybe_flush_progress()
+    PAGES.get(st.session_state.current_page, home_page)()
 
 
 if __name__ == "__main__":
@@ -1,24 +1,32 @@
 # Utils package for MCAT Flashcard App
 from .trivia_api import (
+    MCQ,
     fetch_trivia_api_questions,
     fetch_opentdb_questions,
     fetch_mcat_relevant_questions,
     format_question_for_quiz,
+    format_questions_for_quiz,
     get_biology_questions,
     get_chemistry_questions,
     get_medicine_questions,
     get_physics_questions,
 )
-from .spaced_repetition import SpacedRepetitionSystem
+from .cards import Card
+from .spaced_repetition import SpacedRepetitionSystem, sm2_schedule, sm2_schedule_batch
 
 __all__ = [
+    'Card',
+    'MCQ',
     'fetch_trivia_api_questions',
     'fetch_opentdb_questions',
     'fetch_mcat_relevant_questions',
     'format_question_for_quiz',
+    'format_questions_for_quiz',
     'get_biology_questions',
     'get_chemistry_questions',
     'get_medicine_questions',
     'get_physics_questions',
     'SpacedRepetitionSystem',
+    'sm2_schedule',
+    'sm2_schedule_batch',
 ]
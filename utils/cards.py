@@ -0,0 +1,32 @@
+"""
+Flashcard Record Module
+Immutable card type used for the deck loaded from flashcards.json
+"""
+
+from dataclasses import dataclass
+from typing import Dict
+
+
+# Defined here rather than in app.py so cached pickles always resolve it.
+@dataclass(frozen=True, slots=True)
+class Card:
+    id: int
+    category: str
+    question: str
+    answer: str
+    subcategory: str = ''
+    difficulty: str = ''
+    high_yield: bool = False
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'Card':
+        """Build a card from one entry of the flashcards.json array"""
+        return cls(
+            id=data['id'],
+            category=data['category'],
+            question=data['question'],
+            answer=data['answer'],
+            subcategory=data.get('subcategory', ''),
+            difficulty=data.get('difficulty', ''),
+            high_yield=bool(data.get('high_yield')),
+        )
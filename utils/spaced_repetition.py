@@ -10,13 +10,28 @@ The SM-2 algorithm calculates optimal review intervals based on:
 
 import json
 import os
+import sqlite3
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, fields
 import math
 
+import numpy as np
 
-@dataclass
+try:
+    import orjson
+except ImportError:  # Fall back to the stdlib codec when orjson isn't installed
+    orjson = None
+
+
+def _load_json(raw: bytes):
+    """Parse UTF-8 JSON, using orjson when available"""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+@dataclass(slots=True)
 class CardReviewData:
     """Data structure for tracking card review history"""
     card_id: int
@@ -30,14 +45,112 @@ class CardReviewData:
     is_bookmarked: bool = False
     notes: str = ""
 
+    # Every field is a primitive, so plain reads replace asdict/astuple,
+    # which deep-copy each value
     def to_dict(self) -> Dict:
-        return asdict(self)
+        return {name: getattr(self, name) for name in CARD_FIELDS}
+
+    def to_row(self) -> Tuple:
+        """Field values in CARD_FIELDS order, for the cards table"""
+        return tuple(getattr(self, name) for name in CARD_FIELDS)
 
     @classmethod
     def from_dict(cls, data: Dict) -> 'CardReviewData':
         return cls(**data)
 
 
+# One row per card; columns follow CardReviewData's field order
+CARD_FIELDS = tuple(f.name for f in fields(CardReviewData))
+SRS_DB_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cards (
+    card_id INTEGER PRIMARY KEY,
+    ease_factor REAL NOT NULL DEFAULT 2.5,
+    interval INTEGER NOT NULL DEFAULT 1,
+    repetitions INTEGER NOT NULL DEFAULT 0,
+    next_review TEXT NOT NULL DEFAULT '',
+    last_review TEXT NOT NULL DEFAULT '',
+    total_reviews INTEGER NOT NULL DEFAULT 0,
+    correct_reviews INTEGER NOT NULL DEFAULT 0,
+    is_bookmarked INTEGER NOT NULL DEFAULT 0,
+    notes TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS idx_cards_next_review ON cards (next_review);
+"""
+CARD_UPSERT = (
+    f"INSERT OR REPLACE INTO cards ({', '.join(CARD_FIELDS)}) "
+    f"VALUES ({', '.join('?' for _ in CARD_FIELDS)})"
+)
+
+
+def sm2_schedule(ease_factor: float, interval: int, repetitions: int,
+                 quality: int) -> Tuple[int, float, int]:
+    """
+    Apply one SM-2 review to a card's scheduling state
+
+    Args:
+        ease_factor: Current ease factor
+        interval: Current interval in days
+        repetitions: Number of successful reviews in a row
+        quality: Rating from 0-5
+
+    Returns:
+        Tuple of (new_interval_days, new_ease_factor, new_repetitions)
+    """
+    # Clamp quality to valid range
+    quality = max(0, min(5, quality))
+
+    # Update ease factor
+    # EF' = EF + (0.1 - (5-q) * (0.08 + (5-q) * 0.02))
+    new_ef = ease_factor + (0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+    new_ef = max(1.3, new_ef)  # Minimum ease factor is 1.3
+
+    # Calculate new interval
+    if quality < 3:
+        # Failed review - reset
+        new_interval = 1
+        new_repetitions = 0
+    else:
+        # Successful review
+        if repetitions == 0:
+            new_interval = 1
+        elif repetitions == 1:
+            new_interval = 6
+        else:
+            new_interval = round(interval * new_ef)
+
+        new_repetitions = repetitions + 1
+
+    return new_interval, new_ef, new_repetitions
+
+
+def sm2_schedule_batch(ease_factors: np.ndarray, intervals: np.ndarray,
+                       repetitions: np.ndarray, qualities: np.ndarray
+                       ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Apply one SM-2 review to many cards at once
+
+    Element-wise equivalent of sm2_schedule; np.round rounds half to even
+    like the built-in round, so the intervals match exactly.
+
+    Returns:
+        Tuple of (new_intervals, new_ease_factors, new_repetitions) arrays
+    """
+    ease_factors = np.asarray(ease_factors, dtype=np.float64)
+    intervals = np.asarray(intervals, dtype=np.int64)
+    repetitions = np.asarray(repetitions, dtype=np.int64)
+    lapse = 5 - np.clip(qualities, 0, 5)
+
+    new_ef = np.maximum(1.3, ease_factors + (0.1 - lapse * (0.08 + lapse * 0.02)))
+
+    passed = lapse <= 2  # quality >= 3
+    grown = np.round(intervals * new_ef).astype(np.int64)
+    new_interval = np.where(repetitions == 0, 1, np.where(repetitions == 1, 6, grown))
+    new_interval = np.where(passed, new_interval, 1)
+    new_repetitions = np.where(passed, repetitions + 1, 0)
+
+    return new_interval, new_ef, new_repetitions
+
+
 class SpacedRepetitionSystem:
     """
     Implements the SM-2 Spaced Repetition Algorithm
@@ -56,33 +169,76 @@ class SpacedRepetitionSystem:
         Initialize the SRS system
 
         Args:
-            data_file: Path to JSON file for storing review data
+            data_file: Path to the review data; cards are stored in SQLite
+                next to it (same name, .db extension). An existing JSON
+                file at this path is imported the first time.
         """
         self.data_file = data_file
+        self.db_file = os.path.splitext(data_file)[0] + '.db'
         self.cards: Dict[int, CardReviewData] = {}
+        self._conn: Optional[sqlite3.Connection] = None
         self.load_data()
 
+    def _connect(self) -> sqlite3.Connection:
+        """Open the card store (WAL mode, autocommit) on first use"""
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.db_file) or '.', exist_ok=True)
+            conn = sqlite3.connect(self.db_file, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SRS_DB_SCHEMA)
+            self._conn = conn
+        return self._conn
+
     def load_data(self):
-        """Load review data from file"""
+        """Load review data, importing the legacy JSON file into a new store"""
+        new_db = not os.path.exists(self.db_file)
+        conn = self._connect()
+        if new_db and self.data_file != self.db_file:
+            legacy = self._load_legacy_json()
+            if legacy:
+                self._write_cards(legacy.values())
+
+        self.cards = {}
+        for row in conn.execute(f"SELECT {', '.join(CARD_FIELDS)} FROM cards"):
+            card = CardReviewData(*row)
+            card.is_bookmarked = bool(card.is_bookmarked)
+            self.cards[card.card_id] = card
+
+    def _load_legacy_json(self) -> Dict[int, CardReviewData]:
+        """Cards from the old JSON data file, if present"""
+        cards: Dict[int, CardReviewData] = {}
         if os.path.exists(self.data_file):
             try:
-                with open(self.data_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
+                with open(self.data_file, 'rb') as f:
+                    data = _load_json(f.read())
                     for card_id, card_data in data.get('cards', {}).items():
-                        self.cards[int(card_id)] = CardReviewData.from_dict(card_data)
-            except (json.JSONDecodeError, KeyError) as e:
+                        cards[int(card_id)] = CardReviewData.from_dict(card_data)
+            except (json.JSONDecodeError, KeyError, TypeError) as e:
                 print(f"Error loading SRS data: {e}")
-                self.cards = {}
+                cards = {}
+        return cards
+
+    def _write_cards(self, cards):
+        """Upsert the given cards' rows in one transaction"""
+        conn = self._connect()
+        with conn:
+            conn.execute("BEGIN")
+            conn.executemany(CARD_UPSERT, [card.to_row() for card in cards])
+
+    def _log_change(self, card: CardReviewData):
+        """Persist one card's new state as a single-row upsert"""
+        self._connect().execute(CARD_UPSERT, card.to_row())
 
     def save_data(self):
-        """Save review data to file"""
-        data = {
-            'cards': {str(card_id): card.to_dict() for card_id, card in self.cards.items()},
-            'last_updated': datetime.now().isoformat()
-        }
-        os.makedirs(os.path.dirname(self.data_file), exist_ok=True)
-        with open(self.data_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2)
+        """Write every in-memory card to the store"""
+        self._write_cards(self.cards.values())
+
+    def close(self):
+        """Close the card store; it reopens on the next write"""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
 
     def get_card_data(self, card_id: int) -> CardReviewData:
         """Get or create review data for a card"""
@@ -90,7 +246,7 @@ class SpacedRepetitionSystem:
             self.cards[card_id] = CardReviewData(card_id=card_id)
         return self.cards[card_id]
 
-    def calculate_sm2(self, card_id: int, quality: int) -> Tuple[int, float]:
+    def calculate_sm2(self, card_id: int, quality: int) -> Tuple[int, float, int]:
         """
         Calculate the next review interval using SM-2 algorithm
 
@@ -99,35 +255,10 @@ class SpacedRepetitionSystem:
             quality: Rating from 0-5
 
         Returns:
-            Tuple of (new_interval_days, new_ease_factor)
+            Tuple of (new_interval_days, new_ease_factor, new_repetitions)
         """
         card = self.get_card_data(card_id)
-
-        # Clamp quality to valid range
-        quality = max(0, min(5, quality))
-
-        # Update ease factor
-        # EF' = EF + (0.1 - (5-q) * (0.08 + (5-q) * 0.02))
-        new_ef = card.ease_factor + (0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
-        new_ef = max(1.3, new_ef)  # Minimum ease factor is 1.3
-
-        # Calculate new interval
-        if quality < 3:
-            # Failed review - reset
-            new_interval = 1
-            new_repetitions = 0
-        else:
-            # Successful review
-            if card.repetitions == 0:
-                new_interval = 1
-            elif card.repetitions == 1:
-                new_interval = 6
-            else:
-                new_interval = round(card.interval * new_ef)
-
-            new_repetitions = card.repetitions + 1
-
-        return new_interval, new_ef, new_repetitions
+        return sm2_schedule(card.ease_factor, card.interval, card.repetitions, quality)
 
     def record_review(self, card_id: int, quality: int):
         """
@@ -153,7 +284,7 @@ class SpacedRepetitionSystem:
         if quality >= 3:
             card.correct_reviews += 1
 
-        self.save_data()
+        self._log_change(card)
 
     def record_simple_review(self, card_id: int, correct: bool):
         """
@@ -169,6 +300,52 @@ class SpacedRepetitionSystem:
         quality = 4 if correct else 1
         self.record_review(card_id, quality)
 
+    def record_reviews_bulk(self, reviews: List[Tuple[int, int]]):
+        """
+        Record many reviews at once, e.g. when importing a study history
+
+        Args:
+            reviews: (card_id, quality) pairs, applied in order
+
+        Scheduling runs through sm2_schedule_batch. A card reviewed more
+        than once is handled over several rounds so its reviews still
+        apply in sequence.
+        """
+        pending = list(reviews)
+        while pending:
+            # Take each card's earliest outstanding review this round
+            batch: Dict[int, int] = {}
+            later = []
+            for card_id, quality in pending:
+                if card_id in batch:
+                    later.append((card_id, quality))
+                else:
+                    batch[card_id] = quality
+            pending = later
+
+            cards = [self.get_card_data(card_id) for card_id in batch]
+            qualities = np.fromiter(batch.values(), dtype=np.int64, count=len(batch))
+            intervals, ease_factors, repetitions = sm2_schedule_batch(
+                np.array([card.ease_factor for card in cards]),
+                np.array([card.interval for card in cards]),
+                np.array([card.repetitions for card in cards]),
+                qualities
+            )
+
+            now = datetime.now()
+            for card, quality, interval, ease_factor, reps in zip(
+                    cards, qualities.tolist(), intervals.tolist(),
+                    ease_factors.tolist(), repetitions.tolist()):
+                card.interval = interval
+                card.ease_factor = ease_factor
+                card.repetitions = reps
+                card.last_review = now.isoformat()
+                card.next_review = (now + timedelta(days=interval)).isoformat()
+                card.total_reviews += 1
+                if quality >= 3:
+                    card.correct_reviews += 1
+            self._write_cards(cards)
+
     def get_due_cards(self, all_card_ids: List[int]) -> List[int]:
         """
         Get cards that are due for review
@@ -179,25 +356,41 @@ class SpacedRepetitionSystem:
         Returns:
             List of card IDs that are due for review, sorted by priority
         """
-        now = datetime.now()
-        due_cards = []
+        columns = self._review_columns(all_card_ids)
+        return columns['card_id'][self._due_order(columns)].tolist()
 
-        for card_id in all_card_ids:
-            card = self.get_card_data(card_id)
+    def _review_columns(self, all_card_ids: List[int]) -> Dict[str, np.ndarray]:
+        """Review fields of the given cards as parallel arrays, one pass over cards
 
-            if not card.next_review:
-                # New card, never reviewed
-                due_cards.append((card_id, 0, True))  # (id, days_overdue, is_new)
-            else:
-                next_review = datetime.fromisoformat(card.next_review)
-                if next_review <= now:
-                    days_overdue = (now - next_review).days
-                    due_cards.append((card_id, days_overdue, False))
+        next_review is parsed by NumPy in a single call; cards that were
+        never reviewed get NaT.
+        """
+        cards = [self.get_card_data(card_id) for card_id in all_card_ids]
+        return {
+            'card_id': np.array([card.card_id for card in cards], dtype=np.int64),
+            'next_review': np.array([card.next_review or 'NaT' for card in cards],
+                                    dtype='datetime64[us]'),
+            'interval': np.array([card.interval for card in cards], dtype=np.int64),
+            'ease_factor': np.array([card.ease_factor for card in cards], dtype=np.float64),
+            'repetitions': np.array([card.repetitions for card in cards], dtype=np.int64),
+            'total_reviews': np.array([card.total_reviews for card in cards], dtype=np.int64),
+            'correct_reviews': np.array([card.correct_reviews for card in cards], dtype=np.int64),
+        }
+
+    @staticmethod
+    def _due_order(columns: Dict[str, np.ndarray]) -> np.ndarray:
+        """Positions of the due cards: new cards first, then the most overdue"""
+        next_review = columns['next_review']
+        now = np.datetime64(datetime.now(), 'us')
+        is_new = np.isnat(next_review)
+        due = np.flatnonzero(is_new | (next_review <= now))
 
-        # Sort by: new cards first, then by days overdue (most overdue first)
-        due_cards.sort(key=lambda x: (not x[2], -x[1]))
+        # Whole days overdue, floored like timedelta.days
+        days_overdue = (now - next_review[due]).astype('timedelta64[D]').astype(np.int64)
+        days_overdue[is_new[due]] = 0
 
-        return [card_id for card_id, _, _ in due_cards]
+        # lexsort is stable, so ties keep the order of all_card_ids
+        return due[np.lexsort((-days_overdue, ~is_new[due]))]
 
     def get_study_queue(self, all_card_ids: List[int], limit: int = 20) -> List[int]:
         """
@@ -210,18 +403,14 @@ class SpacedRepetitionSystem:
         Returns:
             Optimized list of card IDs to study
         """
-        due_cards = self.get_due_cards(all_card_ids)
-
-        # Separate new and review cards
-        new_cards = []
-        review_cards = []
+        columns = self._review_columns(all_card_ids)
+        order = self._due_order(columns)
+        due_cards = columns['card_id'][order].tolist()
 
-        for card_id in due_cards:
-            card = self.get_card_data(card_id)
-            if card.total_reviews == 0:
-                new_cards.append(card_id)
-            else:
-                review_cards.append(card_id)
+        # Separate new and review cards from the columns already gathered
+        is_new = columns['total_reviews'][order] == 0
+        new_cards = columns['card_id'][order[is_new]].tolist()
+        review_cards = columns['card_id'][order[~is_new]].tolist()
 
         # Mix: prioritize review cards, but include some new cards
         # Ratio: ~70% review, ~30% new
@@ -233,7 +422,8 @@ class SpacedRepetitionSystem:
         # If we don't have enough, fill with remaining
         remaining = limit - len(queue)
         if remaining > 0:
-            all_remaining = [c for c in due_cards if c not in queue]
+            queued = set(queue)
+            all_remaining = [c for c in due_cards if c not in queued]
             queue.extend(all_remaining[:remaining])
 
         return queue[:limit]
@@ -274,31 +464,26 @@ class SpacedRepetitionSystem:
 
     def get_overall_stats(self, all_card_ids: List[int]) -> Dict:
         """Get overall study statistics"""
+        columns = self._review_columns(all_card_ids)
         total_cards = len(all_card_ids)
-        reviewed_cards = 0
-        mastered_cards = 0
-        struggling_cards = 0
-        total_reviews = 0
-        total_correct = 0
-
-        for card_id in all_card_ids:
-            card = self.get_card_data(card_id)
-            if card.total_reviews > 0:
-                reviewed_cards += 1
-                total_reviews += card.total_reviews
-                total_correct += card.correct_reviews
-
-                mastery = self._get_mastery_level(card)
-                if mastery == "Mastered":
-                    mastered_cards += 1
-                elif mastery == "Struggling":
-                    struggling_cards += 1
+
+        # Same rules as _get_mastery_level, applied to every card at once
+        reviewed = columns['total_reviews'] > 0
+        mastered = reviewed & (columns['interval'] >= 21) & (columns['ease_factor'] >= 2.5)
+        struggling = (reviewed & ~mastered & (columns['interval'] < 7)
+                      & (columns['repetitions'] < 2))
+
+        reviewed_cards = int(np.count_nonzero(reviewed))
+        mastered_cards = int(np.count_nonzero(mastered))
+        struggling_cards = int(np.count_nonzero(struggling))
+        total_reviews = int(columns['total_reviews'].sum())
+        total_correct = int(columns['correct_reviews'].sum())
 
         overall_accuracy = 0
         if total_reviews > 0:
             overall_accuracy = (total_correct / total_reviews) * 100
 
-        due_count = len(self.get_due_cards(all_card_ids))
+        due_count = len(self._due_order(columns))
 
         return {
             'total_cards': total_cards,
@@ -316,7 +501,7 @@ class SpacedRepetitionSystem:
         """Toggle bookmark status for a card"""
         card = self.get_card_data(card_id)
         card.is_bookmarked = not card.is_bookmarked
-        self.save_data()
+        self._log_change(card)
         return card.is_bookmarked
 
     def get_bookmarked_cards(self) -> List[int]:
@@ -326,8 +511,10 @@ class SpacedRepetitionSystem:
     def add_note(self, card_id: int, note: str):
         """Add a note to a card"""
         card = self.get_card_data(card_id)
+        if card.notes == note:
+            return  # Unchanged; skip the write
         card.notes = note
-        self.save_data()
+        self._log_change(card)
 
     def get_note(self, card_id: int) -> str:
         """Get note for a card"""
@@ -337,14 +524,16 @@ class SpacedRepetitionSystem:
     def reset_card(self, card_id: int):
         """Reset a card's learning progress"""
         if card_id in self.cards:
-            bookmarked = self.cards[card_id].is_bookmarked
-            notes = self.cards[card_id].notes
-            self.cards[card_id] = CardReviewData(
+            card = self.cards[card_id]
+            fresh = CardReviewData(
                 card_id=card_id,
-                is_bookmarked=bookmarked,
-                notes=notes
+                is_bookmarked=card.is_bookmarked,
+                notes=card.notes
             )
-            self.save_data()
+            if fresh == card:
+                return  # Already at its starting state; skip the write
+            self.cards[card_id] = fresh
+            self._log_change(fresh)
 
 
 # Test the system
@@ -383,6 +572,14 @@ if __name__ == "__main__":
     # Overall stats
     print(f"\nOverall stats: {srs.get_overall_stats(test_cards)}")
 
+    # Each review was written through, so a fresh instance sees it
+    reloaded = SpacedRepetitionSystem(test_file)
+    print(f"Reloaded card 1: {reloaded.get_card_stats(1)}")
+
     # Cleanup
-    os.unlink(test_file)
+    srs.close()
+    reloaded.close()
+    for path in (test_file, srs.db_file, srs.db_file + '-wal', srs.db_file + '-shm'):
+        if os.path.exists(path):
+            os.unlink(path)
     print("\nTest completed successfully!")
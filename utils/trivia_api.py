@@ -4,13 +4,30 @@ Fetches science, biology, medicine, and chemistry questions from The Trivia API
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import html
+import json
 import random
+import copy
+import functools
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Optional
 
+import numpy as np
+
+try:
+    import orjson
+except ImportError:  # Fall back to the stdlib parser when orjson isn't installed
+    orjson = None
+
 # API Endpoints
 TRIVIA_API_BASE = "https://the-trivia-api.com/v2/questions"
 OPENTDB_API_BASE = "https://opentdb.com/api.php"
+REQUEST_TIMEOUT = (2, 6)  # (connect, read) seconds, same as the app's TRIVIA_TIMEOUT
 
 # Category mappings for The Trivia API
 TRIVIA_API_CATEGORIES = {
@@ -20,6 +37,74 @@ TRIVIA_API_CATEGORIES = {
     "medicine": "science",
 }
 
+# Immutable quiz question; options are stored correct answer first.
+# Defined here rather than in app.py so cached pickles always resolve it.
+MCQ = namedtuple('MCQ', 'question correct_answer options difficulty category source')
+
+# Module-level session so repeat fetches reuse pooled keep-alive connections
+_session = requests.Session()
+_session.headers.update({"User-Agent": "MCAT-StudyHub/1.0"})
+_session.mount("https://", HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=8,
+    max_retries=Retry(total=2, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504])
+))
+
+# Fetched questions are reused for an hour per distinct set of arguments
+TRIVIA_CACHE_TTL = 60 * 60
+TRIVIA_CACHE_MAX_ENTRIES = 64
+
+
+def _parse_json(raw: bytes):
+    """Parse a response body, using orjson when available"""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def _freeze(value):
+    """Hashable stand-in for a cache key argument (lists become tuples)"""
+    return tuple(value) if isinstance(value, list) else value
+
+
+def _ttl_cache(func):
+    """
+    Memoize a fetcher in memory, keyed on its arguments
+
+    Entries expire after TRIVIA_CACHE_TTL seconds and the least recently
+    used entry is dropped past TRIVIA_CACHE_MAX_ENTRIES. Empty results
+    (the fetchers' failure value) are not cached, and callers get a copy
+    so they can't mutate the cached questions.
+    """
+    cache = OrderedDict()
+    lock = threading.Lock()
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        key = (tuple(_freeze(a) for a in args),
+               tuple(sorted((k, _freeze(v)) for k, v in kwargs.items())))
+        now = time.monotonic()
+        with lock:
+            hit = cache.get(key)
+            if hit is not None and now - hit[0] < TRIVIA_CACHE_TTL:
+                cache.move_to_end(key)
+                return copy.deepcopy(hit[1])
+
+        result = func(*args, **kwargs)
+        if result:
+            with lock:
+                cache[key] = (now, result)
+                cache.move_to_end(key)
+                while len(cache) > TRIVIA_CACHE_MAX_ENTRIES:
+                    cache.popitem(last=False)
+        return copy.deepcopy(result)
+
+    wrapper.cache_clear = cache.clear
+    return wrapper
+
+# Shared PCG64 generator for shuffling batches of questions and answers
+_rng = np.random.default_rng()
+
 # Tags for filtering
 MCAT_RELEVANT_TAGS = ["biology", "medicine", "anatomy", "chemistry", "science", "physics"]
 
@@ -31,6 +116,7 @@ OPENTDB_CATEGORIES = {
 }
 
 
+@_ttl_cache
 def fetch_trivia_api_questions(
     limit: int = 10,
     category: str = "science",
@@ -61,10 +147,10 @@ def fetch_trivia_api_questions(
         params["tags"] = ",".join(tags)
 
     try:
-        response = requests.get(TRIVIA_API_BASE, params=params, timeout=10)
+        response = _session.get(TRIVIA_API_BASE, params=params, timeout=REQUEST_TIMEOUT)
         response.raise_for_status()
 
-        questions = response.json()
+        questions = _parse_json(response.content)
 
         # Format questions for our app
         formatted = []
@@ -82,11 +168,12 @@ def fetch_trivia_api_questions(
 
         return formatted
 
-    except requests.RequestException as e:
+    except (requests.RequestException, ValueError) as e:
         print(f"Error fetching from Trivia API: {e}")
         return []
 
 
+@_ttl_cache
 def fetch_opentdb_questions(
     amount: int = 10,
     category: int = 17,  # Science & Nature
@@ -113,10 +200,10 @@ def fetch_opentdb_questions(
         params["difficulty"] = difficulty
 
     try:
-        response = requests.get(OPENTDB_API_BASE, params=params, timeout=10)
+        response = _session.get(OPENTDB_API_BASE, params=params, timeout=REQUEST_TIMEOUT)
         response.raise_for_status()
 
-        data = response.json()
+        data = _parse_json(response.content)
 
         if data.get("response_code") != 0:
             print(f"OpenTDB error code: {data.get('response_code')}")
@@ -138,7 +225,7 @@ def fetch_opentdb_questions(
 
         return formatted
 
-    except requests.RequestException as e:
+    except (requests.RequestException, ValueError) as e:
         print(f"Error fetching from OpenTDB: {e}")
         return []
 
@@ -171,25 +258,28 @@ def fetch_mcat_relevant_questions(
 
     tags = tag_mapping.get(focus_area, MCAT_RELEVANT_TAGS[:3])
 
-    # Fetch from The Trivia API (better for medical/biology)
-    trivia_questions = fetch_trivia_api_questions(
-        limit=limit // 2 + 5,
-        category="science",
-        difficulty=difficulty,
-        tags=tags if focus_area else None
-    )
-    questions.extend(trivia_questions)
-
-    # Fetch from OpenTDB (general science)
-    opentdb_questions = fetch_opentdb_questions(
-        amount=limit // 2 + 5,
-        category=17,
-        difficulty=difficulty
-    )
-    questions.extend(opentdb_questions)
+    # Both sources are independent, so fetch them concurrently
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        # The Trivia API (better for medical/biology)
+        trivia_future = executor.submit(
+            fetch_trivia_api_questions,
+            limit=limit // 2 + 5,
+            category="science",
+            difficulty=difficulty,
+            tags=tags if focus_area else None
+        )
+        # OpenTDB (general science)
+        opentdb_future = executor.submit(
+            fetch_opentdb_questions,
+            amount=limit // 2 + 5,
+            category=17,
+            difficulty=difficulty
+        )
+        questions.extend(trivia_future.result())
+        questions.extend(opentdb_future.result())
 
     # Shuffle and limit
-    random.shuffle(questions)
+    _rng.shuffle(questions)
     return questions[:limit]
 
 
@@ -219,6 +309,45 @@ def format_question_for_quiz(question: Dict) -> Dict:
     }
 
 
+def format_questions_for_quiz(questions: List[Dict]) -> List[Dict]:
+    """
+    Format a batch of questions for the quiz interface
+
+    Same output as format_question_for_quiz, but the answer order for the
+    whole batch comes from one set of random draws instead of one
+    shuffle per question.
+
+    Args:
+        questions: Raw question dictionaries
+
+    Returns:
+        Formatted questions with shuffled options
+    """
+    answers = [[q["correct_answer"]] + q["incorrect_answers"] for q in questions]
+    if not answers:
+        return []
+
+    # Random sort keys per row; padding sorts last so rows of any length work
+    counts = np.array([len(a) for a in answers])
+    keys = _rng.random((len(answers), counts.max()))
+    keys[np.arange(keys.shape[1]) >= counts[:, None]] = np.inf
+    orders = np.argsort(keys, axis=1)
+
+    return [
+        {
+            "id": q["id"],
+            "question": q["question"],
+            "options": [options[i] for i in order[:len(options)]],
+            "correct_answer": q["correct_answer"],
+            "difficulty": q["difficulty"],
+            "category": q["category"],
+            "tags": q.get("tags", []),
+            "source": q.get("source", "unknown")
+        }
+        for q, options, order in zip(questions, answers, orders)
+    ]
+
+
 def get_question_by_tags(tags: List[str], limit: int = 10) -> List[Dict]:
     """
     Get questions filtered by specific tags